@@ -0,0 +1,197 @@
+import asyncio
+import time
+from print_queue_manager import PrintQueueManager, PrintJob
+
+
+class AsyncPrintQueueManager:
+    """
+    An asyncio front-end for PrintQueueManager.
+    Every call goes straight to the wrapped manager on the event loop thread; the
+    manager's lock is only ever held for a few microseconds, so there is no need
+    for run_in_executor(). Priority, aging and expiry behave exactly as in the
+    threaded manager because they are implemented by it.
+
+    Nothing here blocks the loop: under the "block" overflow policy, producers
+    wait for room on an asyncio.Event rather than on the manager's condition
+    variable, and when the manager has a synchronous journal, whose mutating
+    calls wait for an fsync, those calls run in the loop's default executor.
+    """
+    def __init__(self, manager: PrintQueueManager | None = None, **manager_kwargs):
+        """
+        Args:
+            manager (PrintQueueManager | None): The queue to wrap. If omitted, one is
+                created from `manager_kwargs` (capacity, expiry_time, aging_interval, ...).
+        """
+        self.manager = manager if manager is not None else PrintQueueManager(**manager_kwargs)
+        self._loop = None # The event loop the front-end is bound to, set on first use.
+        self._job_ready = None # asyncio.Event set whenever jobs are added to the queue.
+        self._space_ready = None # asyncio.Event set whenever a job leaves a slot free.
+        self._clock_task = None # The task running run_clock(), if started with start_clock().
+
+    def _bind(self) -> asyncio.Event:
+        """
+        Binds the front-end to the running event loop and starts listening for new jobs
+        and freed slots, including those caused by other threads through the wrapped manager.
+        """
+        if self._job_ready is None:
+            self._loop = asyncio.get_running_loop()
+            self._job_ready = asyncio.Event()
+            self._space_ready = asyncio.Event()
+            self.manager.add_job_listener(self._on_job_added)
+            self.manager.add_space_listener(self._on_space_freed)
+        return self._job_ready
+
+    def _on_job_added(self):
+        # Called by the manager from whichever thread added the job.
+        self._wake(self._job_ready)
+
+    def _on_space_freed(self):
+        # Called by the manager, under its lock, from whichever thread removed the job.
+        self._wake(self._space_ready)
+
+    def _wake(self, event: asyncio.Event | None):
+        """
+        Sets `event` on the bound loop from any thread. Does nothing once the front-end
+        is closed or its loop has been closed, e.g. after asyncio.run() returned
+        without close() being called, so the manager keeps working for other threads.
+        """
+        loop = self._loop
+        if event is None or loop is None or loop.is_closed():
+            return
+        try:
+            loop.call_soon_threadsafe(event.set)
+        except RuntimeError:
+            pass # The loop was closed in the meantime.
+
+    async def _call(self, method, *args):
+        """
+        Runs a mutating manager call. With a synchronous journal attached the call
+        waits for an fsync after releasing the lock, so it runs in the default
+        executor instead of on the loop.
+        """
+        journal = self.manager._journal
+        if journal is not None and journal.sync:
+            return await asyncio.get_running_loop().run_in_executor(None, method, *args)
+        return method(*args)
+
+    async def _enqueue(self, new_jobs: list, operation: str) -> list[bool]:
+        """
+        Admits jobs through the manager without blocking the loop. When the "block"
+        policy finds the queue full, the remaining jobs wait here for a slot to be
+        freed, for at most the manager's block_timeout in total, and are then
+        rejected by the manager as they would have been by a blocking call.
+        """
+        self._bind()
+        manager = self.manager
+        deadline = None if manager.block_timeout is None else time.monotonic() + manager.block_timeout
+        results = []
+        while True:
+            self._space_ready.clear()
+            results += await self._call(manager._enqueue, new_jobs[len(results):], None, operation, False)
+            if len(results) == len(new_jobs):
+                return results
+            timeout = None if deadline is None else deadline - time.monotonic()
+            if timeout is not None and timeout <= 0:
+                # Out of time: with a deadline already passed, the manager rejects rather than waits.
+                return results + await self._call(manager._enqueue, new_jobs[len(results):], time.monotonic(),
+                                                  operation)
+            try:
+                await asyncio.wait_for(self._space_ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        """
+        Stops the clock (if running) and detaches from the wrapped manager.
+        Also called on leaving an `async with` block.
+        """
+        self.stop_clock()
+        if self._job_ready is not None:
+            self.manager.remove_job_listener(self._on_job_added)
+            self.manager.remove_space_listener(self._on_space_freed)
+            self._job_ready = None
+            self._space_ready = None
+
+    async def enqueue_job(self, user_id: str, title: str, priority: int = 5, expiry_time: int | None = None) -> bool:
+        """
+        Adds a new print job to the queue (see PrintQueueManager.enqueue_job()).
+        Returns:
+            bool: True if the job was accepted, False if it was rejected.
+        """
+        new_jobs = self.manager._build_jobs([(user_id, title, priority, expiry_time)])
+        return (await self._enqueue(new_jobs, "enqueue"))[0]
+
+    async def enqueue_many(self, jobs_data: list[tuple]) -> list[bool]:
+        """
+        Adds a batch of print jobs (see PrintQueueManager.enqueue_many()).
+        Returns:
+            list[bool]: For each submitted job, True if it was enqueued and False if it was rejected.
+        """
+        return await self._enqueue(self.manager._build_jobs(jobs_data), "enqueue_many")
+
+    async def next_job(self) -> PrintJob:
+        """
+        Prints the highest priority job, suspending until one is available.
+        Returns:
+            PrintJob: The printed job.
+        """
+        job_ready = self._bind()
+        while True:
+            job_ready.clear()
+            if not self.manager.is_empty():
+                job = await self._call(self.manager.print_job)
+                if job is not None:
+                    return job
+            await job_ready.wait()
+
+    async def printed_jobs(self):
+        """
+        Asynchronously iterates over jobs as they are printed, forever.
+        Usage: `async for job in front_end.printed_jobs(): ...`
+        """
+        while True:
+            yield await self.next_job()
+
+    def __aiter__(self):
+        return self.printed_jobs()
+
+    async def run_clock(self, seconds_per_tick: float = 1.0, ticks: int | None = None):
+        """
+        Drives the simulation clock: calls tick() once every `seconds_per_tick`
+        real seconds, `ticks` times (or until cancelled if `ticks` is None).
+        """
+        count = 0
+        while ticks is None or count < ticks:
+            await asyncio.sleep(seconds_per_tick)
+            await self._call(self.manager.tick)
+            count += 1
+
+    def start_clock(self, seconds_per_tick: float = 1.0) -> asyncio.Task:
+        """
+        Starts run_clock() as a background task on the running loop.
+        Returns:
+            asyncio.Task: The clock task (also stopped by stop_clock()).
+        """
+        self.stop_clock()
+        self._clock_task = asyncio.get_running_loop().create_task(self.run_clock(seconds_per_tick))
+        return self._clock_task
+
+    def stop_clock(self):
+        """
+        Cancels the clock task started by start_clock(), if any.
+        """
+        if self._clock_task is not None:
+            self._clock_task.cancel()
+            self._clock_task = None
+
+    def get_queue_snapshot(self) -> dict:
+        """
+        Returns a dictionary representing the current state of the queue.
+        """
+        return self.manager.get_queue_snapshot()
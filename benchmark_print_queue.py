@@ -0,0 +1,334 @@
+# Benchmarks the PrintQueueManager operations at increasing queue sizes and
+# producer-thread counts, with event logging switched off.
+#
+# Usage:
+#   python benchmark_print_queue.py                                   # full run
+#   python benchmark_print_queue.py --capacities 10 1000 --ops 2000   # quick run
+#   python benchmark_print_queue.py --save-baseline baseline.json
+#   python benchmark_print_queue.py --compare baseline.json           # exits with 1 on regressions
+
+import argparse
+import json
+import math
+import platform
+import random
+import sys
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+from print_queue_events import EventLog, OFF
+from print_queue_manager import PrintQueueManager
+
+DEFAULT_CAPACITIES = [10, 100, 1_000, 10_000, 100_000, 1_000_000]
+DEFAULT_THREADS = [1, 2, 4, 8]
+PREFILL_CHUNK = 1_000 # Jobs enqueued per simulated second while filling a queue, so jobs spread over aging phases.
+SNAPSHOT_JOB_BUDGET = 200_000 # Jobs copied in total by the get_queue_snapshot benchmark of each capacity.
+
+
+def _new_manager(capacity: int, expiry_time: int = 10**9) -> PrintQueueManager:
+    return PrintQueueManager(capacity, expiry_time, aging_interval=5, event_log=EventLog(level=OFF))
+
+
+def _prefill(manager: PrintQueueManager, count: int, rng: random.Random, chunk: int = PREFILL_CHUNK):
+    """
+    Enqueues `count` jobs with random priorities, advancing the clock one second per chunk.
+    """
+    while count > 0:
+        batch = min(chunk, count)
+        manager.enqueue_many([(f"user{rng.randrange(100)}", "prefill", rng.randint(1, 5)) for _ in range(batch)])
+        manager.advance(1)
+        count -= batch
+
+
+def _timed_calls(call, count: int, latencies: list):
+    # One perf_counter_ns() pair per call; appending to a preallocated local list keeps the overhead small.
+    clock = time.perf_counter_ns
+    append = latencies.append
+    for _ in range(count):
+        start = clock()
+        call()
+        append(clock() - start)
+
+
+def _run_threads(threads: int, work) -> tuple[list[int], float]:
+    """
+    Runs work(thread_index, latencies) in `threads` threads that start together.
+    Returns:
+        tuple[list[int], float]: The latencies of all threads and the wall time from start to last finish.
+    """
+    if threads == 1:
+        latencies = []
+        start = time.perf_counter()
+        work(0, latencies)
+        return latencies, time.perf_counter() - start
+    barrier = threading.Barrier(threads + 1)
+    per_thread = [[] for _ in range(threads)]
+
+    def runner(index):
+        barrier.wait()
+        work(index, per_thread[index])
+
+    workers = [threading.Thread(target=runner, args=(i,)) for i in range(threads)]
+    for worker in workers:
+        worker.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+    return [latency for latencies in per_thread for latency in latencies], elapsed
+
+
+# ======================================================================
+# BENCHMARKS
+# Each benchmark sets up a queue of the given capacity (untimed), then
+# times individual calls of one operation. It returns the per-call
+# latencies in nanoseconds and the wall time of the timed part.
+# ======================================================================
+
+def bench_enqueue_job(capacity, ops, threads, rng):
+    calls = min(ops, capacity) // threads * threads
+    manager = _new_manager(capacity)
+    _prefill(manager, capacity - calls, rng)
+
+    def work(index, latencies):
+        user = f"producer{index}"
+        _timed_calls(lambda: manager.enqueue_job(user, "bench", 3), calls // threads, latencies)
+    return _run_threads(threads, work)
+
+
+def bench_handle_simultaneous_submissions(capacity, ops, threads, rng, batch_size=10):
+    batch_size = min(batch_size, capacity)
+    batches = max(threads, min(ops, capacity // batch_size)) // threads * threads
+    batches = min(batches, capacity // batch_size) # Threads beyond the queue's room get no batches.
+    manager = _new_manager(capacity)
+    _prefill(manager, capacity - batches * batch_size, rng)
+    batch = [(f"user{i}", "bench", 1 + i % 5) for i in range(batch_size)]
+
+    def work(index, latencies):
+        share = batches // threads + (1 if index < batches % threads else 0)
+        _timed_calls(lambda: manager.handle_simultaneous_submissions(batch), share, latencies)
+    return _run_threads(threads, work)
+
+
+def bench_print_job(capacity, ops, threads, rng):
+    manager = _new_manager(capacity)
+    _prefill(manager, capacity, rng)
+    return _run_threads(1, lambda index, latencies: _timed_calls(manager.print_job, min(ops, capacity), latencies))
+
+
+def bench_tick(capacity, ops, threads, rng):
+    manager = _new_manager(capacity)
+    _prefill(manager, capacity, rng)
+    return _run_threads(1, lambda index, latencies: _timed_calls(manager.tick, ops, latencies))
+
+
+def bench_apply_priority_aging(capacity, ops, threads, rng):
+    manager = _new_manager(capacity)
+    _prefill(manager, capacity, rng)
+
+    def age():
+        manager.apply_priority_aging()
+        manager.current_simulation_time += 1 # Move the clock so that the next call has a cohort due.
+    return _run_threads(1, lambda index, latencies: _timed_calls(age, ops, latencies))
+
+
+def bench_remove_expired_jobs(capacity, ops, threads, rng):
+    # Jobs are spread so that a similar share of them expires on each of the `ops` calls.
+    per_second = max(1, -(-capacity // ops))
+    expiry_time = -(-capacity // per_second) + 1
+    manager = _new_manager(capacity, expiry_time)
+    _prefill(manager, capacity, rng, chunk=per_second)
+    calls = min(ops, expiry_time)
+
+    def expire():
+        manager.current_simulation_time += 1
+        manager.remove_expired_jobs()
+    return _run_threads(1, lambda index, latencies: _timed_calls(expire, calls, latencies))
+
+
+def bench_get_queue_snapshot(capacity, ops, threads, rng):
+    manager = _new_manager(capacity)
+    _prefill(manager, capacity, rng)
+    calls = max(3, min(ops, SNAPSHOT_JOB_BUDGET // capacity))
+    return _run_threads(1, lambda index, latencies: _timed_calls(manager.get_queue_snapshot, calls, latencies))
+
+
+BENCHMARKS = {
+    "enqueue_job": bench_enqueue_job,
+    "print_job": bench_print_job,
+    "tick": bench_tick,
+    "apply_priority_aging": bench_apply_priority_aging,
+    "remove_expired_jobs": bench_remove_expired_jobs,
+    "get_queue_snapshot": bench_get_queue_snapshot,
+    "handle_simultaneous_submissions": bench_handle_simultaneous_submissions,
+}
+THREADED_BENCHMARKS = {"enqueue_job", "handle_simultaneous_submissions"} # Producer-side operations.
+
+
+# ======================================================================
+# RUNNING & REPORTING
+# ======================================================================
+
+def percentile(sorted_values: list, fraction: float):
+    """
+    Nearest-rank percentile of an already sorted list.
+    """
+    if not sorted_values:
+        return 0
+    rank = min(len(sorted_values), max(1, math.ceil(fraction * len(sorted_values)))) - 1
+    return sorted_values[rank]
+
+
+def run_case(operation: str, capacity: int, threads: int, ops: int, seed: int, measure_memory: bool) -> dict:
+    """
+    Runs one benchmark case and summarises it.
+    Returns:
+        dict: operation, capacity, threads, ops, ops_per_sec, p50_us, p95_us, p99_us, max_us and
+            peak_memory (bytes allocated at the peak of a separate traced run, or None).
+    """
+    bench = BENCHMARKS[operation]
+    latencies, elapsed = bench(capacity, ops, threads, random.Random(seed))
+    latencies.sort()
+    peak_memory = None
+    if measure_memory:
+        # A second, traced run: tracemalloc slows allocations down too much to share the timed run.
+        tracemalloc.start()
+        try:
+            bench(capacity, ops, threads, random.Random(seed))
+            peak_memory = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return {
+        'operation': operation,
+        'capacity': capacity,
+        'threads': threads,
+        'ops': len(latencies),
+        'ops_per_sec': len(latencies) / elapsed if elapsed else 0.0,
+        'p50_us': percentile(latencies, 0.50) / 1000,
+        'p95_us': percentile(latencies, 0.95) / 1000,
+        'p99_us': percentile(latencies, 0.99) / 1000,
+        'max_us': (latencies[-1] if latencies else 0) / 1000,
+        'peak_memory': peak_memory,
+    }
+
+
+def _format_bytes(size) -> str:
+    if size is None:
+        return "-"
+    for unit in ("B", "KiB", "MiB"):
+        if size < 1024:
+            return f"{size:.0f}{unit}" if unit == "B" else f"{size:.1f}{unit}"
+        size /= 1024
+    return f"{size:.2f}GiB"
+
+
+def print_result_header():
+    print(f"{'Operation':<32} | {'Capacity':>9} | {'Thr':>3} | {'Ops':>7} | {'Ops/s':>11} | "
+          f"{'p50 (us)':>9} | {'p95 (us)':>9} | {'p99 (us)':>9} | {'Peak mem':>9}")
+    print("-" * 120)
+
+
+def print_result(result: dict):
+    print(f"{result['operation']:<32} | {result['capacity']:>9,} | {result['threads']:>3} | {result['ops']:>7,} | "
+          f"{result['ops_per_sec']:>11,.0f} | {result['p50_us']:>9.2f} | {result['p95_us']:>9.2f} | "
+          f"{result['p99_us']:>9.2f} | {_format_bytes(result['peak_memory']):>9}", flush=True)
+
+
+def _case_key(result: dict) -> tuple:
+    return result['operation'], result['capacity'], result['threads']
+
+
+def compare_results(results: list[dict], baseline: dict, tolerance: float) -> list[str]:
+    """
+    Compares results with a saved baseline. A case regresses if its throughput
+    dropped, or its p99 latency or peak memory grew, by more than `tolerance`.
+    Returns:
+        list[str]: One message per regression.
+    """
+    previous = {_case_key(result): result for result in baseline['results']}
+    regressions = []
+    print("\n=== Comparison With Baseline ===")
+    print(f"{'Operation':<32} | {'Capacity':>9} | {'Thr':>3} | {'Ops/s':>8} | {'p99':>8} | {'Peak mem':>8}")
+    print("-" * 85)
+    for result in results:
+        old = previous.get(_case_key(result))
+        if old is None:
+            continue
+        changes = []
+        for key, label, higher_is_better in (('ops_per_sec', "throughput", True), ('p99_us', "p99 latency", False),
+                                             ('peak_memory', "peak memory", False)):
+            if old.get(key) in (None, 0) or result[key] is None:
+                changes.append(None)
+                continue
+            change = result[key] / old[key] - 1
+            changes.append(change)
+            if (-change if higher_is_better else change) > tolerance:
+                regressions.append(f"{result['operation']} (capacity {result['capacity']:,}, {result['threads']} "
+                                   f"thread(s)): {label} {old[key]:,.2f} -> {result[key]:,.2f} ({change:+.1%})")
+        cells = " | ".join(f"{'-':>8}" if change is None else f"{change:>+8.1%}" for change in changes)
+        print(f"{result['operation']:<32} | {result['capacity']:>9,} | {result['threads']:>3} | {cells}")
+    print("=" * 85)
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark PrintQueueManager operations at scale.")
+    parser.add_argument("--operations", nargs="+", choices=list(BENCHMARKS), default=list(BENCHMARKS),
+                        help="operations to benchmark (default: all)")
+    parser.add_argument("--capacities", nargs="+", type=int, default=DEFAULT_CAPACITIES,
+                        help="queue capacities to benchmark (default: 10 to 10^6)")
+    parser.add_argument("--threads", nargs="+", type=int, default=DEFAULT_THREADS,
+                        help="producer-thread counts for enqueue_job and handle_simultaneous_submissions")
+    parser.add_argument("--ops", type=int, default=10_000, help="timed calls per case (default: 10000)")
+    parser.add_argument("--seed", type=int, default=0, help="random seed for job priorities")
+    parser.add_argument("--no-memory", action="store_true", help="skip the traced run that measures peak memory")
+    parser.add_argument("--save-baseline", metavar="PATH", help="write the results to a JSON baseline file")
+    parser.add_argument("--compare", metavar="PATH", help="compare the results with a JSON baseline file")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="relative change counted as a regression when comparing (default: 0.10)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    print(f"INFO: Benchmarking on Python {platform.python_version()} ({platform.platform()}).")
+    print_result_header()
+    results = []
+    for operation in args.operations:
+        for capacity in args.capacities:
+            for threads in (args.threads if operation in THREADED_BENCHMARKS else [1]):
+                result = run_case(operation, capacity, threads, args.ops, args.seed, not args.no_memory)
+                print_result(result)
+                results.append(result)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as baseline_file:
+            json.dump({
+                'created_at': datetime.now().isoformat(),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'ops': args.ops,
+                'results': results,
+            }, baseline_file, indent=2)
+        print(f"INFO: Baseline saved to {args.save_baseline}.")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)
+        if baseline.get('ops') != args.ops:
+            print(f"WARNING: The baseline was recorded with --ops {baseline.get('ops')}, this run used --ops {args.ops}; "
+                  f"tail latencies are not directly comparable.")
+        regressions = compare_results(results, baseline, args.tolerance)
+        if regressions:
+            print(f"WARNING: {len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+            for message in regressions:
+                print(f"  - {message}")
+            return 1
+        print("INFO: No regressions against the baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
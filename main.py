@@ -2,13 +2,14 @@
 # creating a PrintQueueManager instance and calling its methods.
 
 from print_queue_manager import PrintQueueManager
+from simulation_engine import SimulationEngine, trace_from_events
 import time
 
 def main():
     """
     Main function to set up and run a condensed print queue simulation.
-    This version directly calls methods on the PrintQueueManager instance
-    based on a defined sequence of events.
+    The defined sequence of events is replayed as a trace by a SimulationEngine,
+    which calls the matching methods on the PrintQueueManager instance.
     """
     print("INFO: main() function started for Print Queue Simulation.")
     # Note:
@@ -49,8 +50,9 @@ def main():
 
         ("comment", "\n--- Phase 4: Extended Time & Job Expiry ---"),
         # Simulate significant time passing to trigger job expiry.
-        # Since each 'tick' is 1 second, 55 ticks will bring total simulation time to 60s+ for older jobs.
-        *[("tick",) for _ in range(55)], # Simulate 55 additional seconds
+        # 'advance' jumps the clock in one step, with the same result as 55 individual ticks,
+        # bringing total simulation time to 60s+ for older jobs.
+        ("advance", 55), # Simulate 55 additional seconds
         ("show_status",), # Display status after time has passed, expecting some jobs to expire.
 
         ("comment", "\n--- Phase 5: Final Prints & Empty Queue ---"),
@@ -67,31 +69,11 @@ def main():
     ]
     print("INFO: Simulation events defined.")
 
-    # Process each event in the simulation sequence.
-    for i, (event_type, *args) in enumerate(simulation_events):
-        print(f"\n--- Processing Event {i+1}: {event_type.replace('_', ' ').title()} ---")
-        # time.sleep(0.1) # Optional: Uncomment to slow down simulation output for easier reading.
-
-        # Use if-elif-else to call the appropriate method on the pq_manager instance.
-        if event_type == "enqueue":
-            # Arguments for enqueue: user_id, title, priority
-            pq_manager.enqueue_job(*args)
-        elif event_type == "tick":
-            # The tick method in PrintQueueManager now manages its own time increment (1 second per call).
-            pq_manager.tick()
-        elif event_type == "print_job":
-            pq_manager.print_job()
-        elif event_type == "show_status":
-            pq_manager.show_status()
-        elif event_type == "simultaneous_submit":
-            # Arguments for simultaneous_submit: list of (user_id, title, priority) tuples
-            pq_manager.handle_simultaneous_submissions(*args)
-        elif event_type == "comment":
-            # Simply print the comment string provided in args.
-            print(f"\n{args[0]}")
-        else:
-            print(f"ERROR: Unknown event type encountered: {event_type}")
-        print(f"INFO: Finished event {i+1}. Current simulation time: {pq_manager.current_simulation_time}s.")
+    # Replay the events as a timestamped trace: ticks become gaps between timestamps, which the
+    # engine skips in one step, and every other event is dispatched through its handler table.
+    engine = SimulationEngine(pq_manager, verbose=True)
+    engine.run(trace_from_events(simulation_events))
+    engine.show_summary()
 
     print("\n--- Print Queue Simulation Complete ---")
     print("INFO: main() function finished.")
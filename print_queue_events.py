@@ -0,0 +1,163 @@
+import atexit
+import sys
+import threading
+from collections import deque
+from logging import DEBUG, INFO, WARNING, ERROR, getLevelName
+from typing import NamedTuple
+
+# DEBUG, INFO, WARNING and ERROR are the standard logging levels, so they compare and configure the same way.
+OFF = ERROR + 10 # A level above every event, used to silence an EventLog entirely.
+
+
+class EventRecord(NamedTuple):
+    """
+    A single structured event emitted by the PrintQueueManager.
+    The fields are captured at emission time and only turned into text by a sink.
+    """
+    sim_time: int # Simulation time (seconds) at which the event happened.
+    level: int # Severity of the event (DEBUG, INFO, WARNING or ERROR).
+    event: str # Event name, e.g. "job_enqueued" or "tick".
+    fields: dict # Event-specific values used to render the message.
+
+
+# Console message templates, keyed by event name. A leading newline is printed before the "[time] LEVEL:" prefix.
+EVENT_MESSAGES = {
+    "manager_initialized": "PrintQueueManager initialized with capacity={capacity}, expiry={expiry_time}s, aging_interval={aging_interval}s.",
+    "job_enqueued": "Job '{job.title}' (ID: {job.job_id:.8}...) added to queue. (Size: {size}/{capacity})",
+    "job_rejected": "Queue is full. Cannot add job '{title}'.",
+    "job_evicted": "Queue is full. Evicted job '{job.title}' (ID: {job.job_id:.8}..., Priority: {job.priority}) to make room for '{title}'.",
+    "job_spilled": "Queue is full. Job '{job.title}' (ID: {job.job_id:.8}...) held in the overflow store. (Overflow: {overflow})",
+    "job_invalid": "Rejected invalid job submission {job_info!r}: {reason}",
+    "queue_empty": "No jobs in queue to print.",
+    "job_printed": "Printing job: '{job.title}' (ID: {job.job_id:.8}..., Priority: {job.priority}, Wait Time: {job.waiting_time:.1f}s). Current queue size: {size}.",
+    "job_started": "{printer} started printing '{job.title}' (ID: {job.job_id:.8}..., Priority: {job.priority}, Wait Time: {job.waiting_time:.1f}s). Current queue size: {size}.",
+    "job_completed": "{printer} finished printing '{job.title}' (ID: {job.job_id:.8}...).",
+    "aging_started": "Applying priority aging...",
+    "job_cancelled": "Job '{job.title}' (ID: {job.job_id:.8}...) cancelled. Current queue size: {size}.",
+    "user_jobs_cancelled": "--- {count} job(s) of user '{user_id}' cancelled. Current queue size: {size}. ---",
+    "job_reprioritized": "Job '{job.title}' (ID: {job.job_id:.8}...) priority changed from {old_priority} to {new_priority}.",
+    "job_aged": "Cohort of {count} job(s) (aging phase {phase}) priority aged from {old_priority} to {new_priority}.",
+    "aging_complete": "Priority aging check complete.",
+    "expiry_started": "Checking for expired jobs...",
+    "job_expired": "[JOB EXPIRED] Job '{job.title}' (ID: {job.job_id:.8}...) for user '{job.user_id}' has expired and been removed from the queue.",
+    "expiry_complete": "--- {count} job(s) removed due to expiry. Current queue size: {size}. ---",
+    "no_expired_jobs": "No expired jobs to remove.",
+    "batch_started": "\n--- Handling simultaneous job submissions ---",
+    "batch_complete": "--- All concurrent job submissions processed. ---",
+    "tick": "\nTICK! Simulating 1 second passing.",
+    "waiting_advanced": "Waiting time advanced by 1s for {size} job(s).",
+    "tick_complete": "Tick processing complete.",
+    "advance": "\nADVANCE! Fast-forwarding {seconds} second(s) to {target_time}s.",
+    "advance_complete": "Advance complete. Current queue size: {size}.",
+    "listener_failed": "Queue listener {callback!r} raised {error!r}; ignored.",
+    "journal_recovered": "Recovered {jobs} job(s) from journal '{directory}' (snapshot LSN {snapshot_lsn}, {replayed} log record(s) replayed).",
+}
+
+
+def format_event(record: EventRecord) -> str:
+    """
+    Renders an EventRecord as the console line "[<time>s] <LEVEL>: <message>".
+    Args:
+        record (EventRecord): The event to render.
+    Returns:
+        str: The formatted line.
+    """
+    template = EVENT_MESSAGES.get(record.event)
+    message = template.format(**record.fields) if template else f"{record.event} {record.fields}"
+    stripped = message.lstrip("\n")
+    blank_lines = message[:len(message) - len(stripped)]
+    return f"{blank_lines}[{record.sim_time}s] {getLevelName(record.level)}: {stripped}"
+
+
+class ConsoleSink:
+    """
+    Writes events to a text stream (stdout by default) in the simulator's console format.
+    """
+    def __init__(self, stream=None):
+        self.stream = stream # Target stream; None means whatever sys.stdout is at write time.
+
+    def __call__(self, record: EventRecord):
+        print(format_event(record), file=self.stream or sys.stdout)
+
+
+class EventLog:
+    """
+    A level-gated, structured event log for the print queue.
+    emit() only checks the level and appends the record to a pending buffer, so
+    it is cheap enough to call while holding the queue lock; disabled events are
+    never built into records and nothing is formatted until a sink handles it.
+    Pending records are delivered to the sinks either by a background writer
+    thread (background=True) or when the owner calls dispatch() after releasing
+    its lock.
+    """
+    def __init__(self, sinks: list | None = None, level: int = INFO, background: bool = False):
+        self.sinks = list(sinks) if sinks is not None else [ConsoleSink()] # Callables that receive EventRecords.
+        self.level = level # Minimum level that is recorded.
+        self.background = background # Whether a writer thread delivers records.
+        self._pending = deque() # Records emitted but not yet delivered to the sinks.
+        self._deliver_lock = threading.Lock() # Keeps delivery in emission order across threads.
+        self._wakeup = None # Signals the background writer that records are pending.
+        self._closed = False
+        self._writer = None
+        if background:
+            self._wakeup = threading.Event()
+            self._writer = threading.Thread(target=self._run_writer, name="print-queue-events", daemon=True)
+            self._writer.start()
+            atexit.register(self.close)
+
+    def enabled(self, level: int) -> bool:
+        """
+        Checks whether events at the given level are recorded.
+        """
+        return level >= self.level
+
+    def emit(self, level: int, event: str, sim_time: int, **fields):
+        """
+        Records an event if its level is enabled. Does no I/O and no formatting.
+        Args:
+            level (int): Severity of the event.
+            event (str): Event name, e.g. "job_enqueued".
+            sim_time (int): Simulation time of the event.
+            **fields: Values used to render the event.
+        """
+        if level < self.level:
+            return
+        self._pending.append(EventRecord(sim_time, level, event, fields))
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def dispatch(self):
+        """
+        Delivers pending records in the calling thread, unless a background writer
+        is responsible for them. Call this after releasing any lock held during emit().
+        """
+        if not self.background:
+            self.flush()
+
+    def flush(self):
+        """
+        Delivers every pending record before returning.
+        """
+        with self._deliver_lock:
+            while self._pending:
+                record = self._pending.popleft()
+                for sink in self.sinks:
+                    sink(record)
+
+    def close(self):
+        """
+        Stops the background writer (if any) after delivering the pending records.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        if self._writer is not None:
+            self._wakeup.set()
+            self._writer.join()
+        self.flush()
+
+    def _run_writer(self):
+        while not self._closed:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            self.flush()
@@ -0,0 +1,499 @@
+import atexit
+import glob
+import itertools
+import mmap
+import os
+import struct
+import threading
+import zlib
+from print_queue_events import EventLog, INFO, OFF
+from print_queue_manager import (PrintJob, PrintQueueManager, STATUS_COMPLETED, STATUS_PRINTING, STATUS_EXPIRED,
+                                 STATUS_EVICTED, STATUS_CANCELLED, _reserve_job_numbers)
+from print_queue_metrics import QueueMetrics
+
+# ======================================================================
+# ON-DISK FORMATS
+# Log segments ("wal-<first LSN>.log") hold records appended in LSN order:
+#   header: payload length (I), CRC-32 of the rest (I); body: LSN (Q), kind (B), payload.
+# A torn or corrupt record ends the log; recovery truncates it away.
+# Snapshots ("snapshot-<LSN>.bin") hold every queued job at one LSN as a
+# header, fixed-size job records and a blob of UTF-8 user IDs and titles.
+# ======================================================================
+
+_RECORD_HEADER = struct.Struct("<II")
+_RECORD_BODY = struct.Struct("<QB")
+
+LOG_ENQUEUE = 1 # A job entered the queue.
+LOG_REMOVE = 2 # A job left the queue (printed, taken by a printer, expired, evicted or cancelled).
+LOG_CLOCK = 3 # tick() moved the clock forward by one second.
+LOG_AGE = 4 # Priority aging was applied at a simulation time.
+LOG_AGE_UNTIL = 5 # advance() aged the queue up to a simulation time.
+LOG_REPRIORITIZE = 6 # A queued job was given a new priority.
+
+# number, job ID node, seq, enqueued_at, expiry_time, priority, created, user ID length, title length
+_ENQUEUE = struct.Struct("<QQQqqqdII")
+_REMOVE = struct.Struct("<QB") # job number, status code
+_TIME = struct.Struct("<q") # simulation time
+_REPRIORITIZE = struct.Struct("<Qq") # job number, new priority
+_STATUS_CODES = {STATUS_COMPLETED: 1, STATUS_PRINTING: 2, STATUS_EXPIRED: 3, STATUS_EVICTED: 4, STATUS_CANCELLED: 5}
+_STATUSES = {code: status for status, code in _STATUS_CODES.items()}
+
+_SNAPSHOT_MAGIC = b"PQSNAP01"
+# magic, LSN, current time, last aging time, job count, last job seq, CRC-32 of everything after the header
+_SNAPSHOT_HEADER = struct.Struct("<8sQqqQQI")
+# Same fields as an enqueue record, with the job's current priority level.
+_SNAPSHOT_JOB = _ENQUEUE
+
+
+def _read_records(data: bytes):
+    """
+    Decodes log records from a segment's contents.
+    Yields:
+        tuple: (LSN, kind, payload, end offset) for each intact record, stopping at the first torn one.
+    """
+    offset = 0
+    header_size = _RECORD_HEADER.size
+    body_size = _RECORD_BODY.size
+    while offset + header_size + body_size <= len(data):
+        length, checksum = _RECORD_HEADER.unpack_from(data, offset)
+        start = offset + header_size
+        end = start + body_size + length
+        if end > len(data) or zlib.crc32(data[start:end]) != checksum:
+            return
+        lsn, kind = _RECORD_BODY.unpack_from(data, start)
+        yield lsn, kind, data[start + body_size:end], end
+        offset = end
+
+
+class Journal:
+    """
+    Optional durability for a PrintQueueManager: a write-ahead log of every
+    change to the queue plus periodic compact snapshots, both kept in one
+    directory. Pass it to the manager, which first recovers the queue from the
+    directory and then logs to it:
+
+        manager = PrintQueueManager(capacity=100, journal=Journal("queue-data"))
+
+    While holding the queue lock the manager only encodes records into an
+    in-memory buffer. A writer thread appends the buffered records to the log
+    and fsyncs them as one batch (group commit), so concurrent producers share
+    fsyncs. With sync=True every mutating call returns only once its records
+    are on disk; with sync=False records reach the disk within about one batch.
+
+    After `snapshot_every` records a background thread writes a snapshot of the
+    queued jobs and deletes the log segments it covers. Recovery maps the latest
+    snapshot into memory and replays only the log written after it, so restart
+    time depends on the live queue, not on the total history.
+
+    Jobs held in the overflow store of the "spill" policy are logged when they
+    join the queue, so a crash loses the jobs still waiting there.
+    """
+    def __init__(self, directory: str, sync: bool = True, commit_delay: float = 0.0, snapshot_every: int = 100_000):
+        """
+        Args:
+            directory (str): Directory holding the log segments and snapshots; created if missing.
+            sync (bool): Whether mutating calls wait until their changes are durable.
+            commit_delay (float): Seconds the writer waits for more records before each fsync.
+                Larger values make batches bigger at the cost of commit latency.
+            snapshot_every (int): Log records between automatic snapshots (0 disables them).
+        """
+        self.directory = directory
+        self.sync = sync
+        self.commit_delay = commit_delay
+        self.snapshot_every = snapshot_every
+        os.makedirs(directory, exist_ok=True)
+
+        self._manager = None # The manager this journal is attached to.
+        self._cond = threading.Condition() # Guards the buffer and LSN counters below.
+        self._buffer = [] # Encoded records waiting for the writer.
+        self._last_lsn = 0 # LSN of the last record appended to the buffer.
+        self._durable_lsn = 0 # LSN up to which records are fsynced.
+        self._since_snapshot = 0 # Records appended since the last snapshot was taken.
+        self._rotate_requested = False # Set by snapshot(); the writer then starts a new segment.
+        self._error = None # The exception that stopped the writer, if any.
+        self._closed = False
+        self._file = None # The open log segment (writer thread only, after recovery).
+        self._segment_lsn = None # First LSN of the open segment.
+        self._snapshot_lock = threading.Lock() # One snapshot at a time.
+        self._snapshot_thread = None
+        self._writer = None
+
+        # --- Journal Statistics ---
+        self.commits = 0 # Number of fsynced batches.
+        self.records_written = 0
+        self.snapshots_written = 0
+
+    # --- Paths ---
+
+    def _segment_path(self, first_lsn: int) -> str:
+        return os.path.join(self.directory, f"wal-{first_lsn:020d}.log")
+
+    def _snapshot_path(self, lsn: int) -> str:
+        return os.path.join(self.directory, f"snapshot-{lsn:020d}.bin")
+
+    def _listed(self, prefix: str) -> list[tuple[int, str]]:
+        # (LSN in the file name, path), in LSN order.
+        paths = glob.glob(os.path.join(self.directory, f"{prefix}-*.*"))
+        return sorted((int(os.path.basename(path)[len(prefix) + 1:].split(".")[0]), path) for path in paths
+                      if not path.endswith(".tmp"))
+
+    def _fsync_directory(self):
+        if hasattr(os, "O_DIRECTORY"):
+            fd = os.open(self.directory, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    # ======================================================================
+    # RECOVERY
+    # ======================================================================
+
+    def open(self, manager: PrintQueueManager) -> dict:
+        """
+        Recovers the jobs recorded in the directory into `manager` (normally a new,
+        empty one) and starts logging its changes. Called by PrintQueueManager.__init__().
+        Returns:
+            dict: jobs (recovered), snapshot_lsn and replayed (log records applied after the snapshot).
+        Raises:
+            ValueError: If the recovered jobs do not fit in the manager's capacity.
+        """
+        if self._manager is not None:
+            raise RuntimeError("this journal is already attached to a PrintQueueManager")
+        events = manager.events
+        manager.events = EventLog(sinks=[], level=OFF) # Replayed operations are not news.
+        try:
+            with manager.lock:
+                stats = self._recover(manager)
+        finally:
+            manager.events = events
+        manager.metrics = QueueMetrics()
+
+        self._open_segment(self._last_lsn + 1)
+        self._durable_lsn = self._last_lsn
+        self._manager = manager
+        manager._journal = self
+        self._writer = threading.Thread(target=self._run_writer, name="print-queue-journal", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+        events.emit(INFO, "journal_recovered", manager.current_simulation_time, directory=self.directory, **stats)
+        events.dispatch()
+        return stats
+
+    def _recover(self, manager: PrintQueueManager) -> dict:
+        live = {} # job number -> job, for the jobs currently queued
+        last_seq = -1
+        last_number = 0
+        snapshot_lsn = 0
+        snapshots = self._listed("snapshot")
+        if snapshots:
+            snapshot_lsn, path = snapshots[-1]
+            last_seq = self._load_snapshot(manager, path, live)
+            last_number = max(live, default=0)
+
+        replayed = 0
+        self._last_lsn = snapshot_lsn
+        segments = self._listed("wal")
+        for index, (_, path) in enumerate(segments):
+            with open(path, "rb") as segment:
+                data = segment.read()
+            good_end = 0
+            for lsn, kind, payload, end in _read_records(data):
+                good_end = end
+                if lsn <= snapshot_lsn:
+                    continue
+                if kind == LOG_ENQUEUE:
+                    job, seq = self._decode_job(payload)
+                    self._check_room(manager, len(live) + 1)
+                    manager._place_job(job)
+                    live[job._number] = job
+                    last_seq = max(last_seq, seq)
+                    last_number = max(last_number, job._number)
+                elif kind == LOG_REMOVE:
+                    number, status = _REMOVE.unpack(payload)
+                    manager._remove_job(live.pop(number), _STATUSES[status])
+                elif kind == LOG_CLOCK:
+                    manager.current_simulation_time = _TIME.unpack(payload)[0]
+                elif kind == LOG_AGE:
+                    manager.current_simulation_time = _TIME.unpack(payload)[0]
+                    manager._age_due_cohorts()
+                elif kind == LOG_AGE_UNTIL:
+                    manager._age_until(_TIME.unpack(payload)[0])
+                elif kind == LOG_REPRIORITIZE:
+                    number, priority = _REPRIORITIZE.unpack(payload)
+                    manager._move_job(live[number], priority)
+                self._last_lsn = lsn
+                replayed += 1
+            if good_end < len(data):
+                # A torn write from a crash: drop it, and anything after it, so the log stays readable.
+                with open(path, "r+b") as segment:
+                    segment.truncate(good_end)
+                for _, later_path in segments[index + 1:]:
+                    os.remove(later_path)
+                break
+
+        manager._enqueue_seq = itertools.count(last_seq + 1)
+        _reserve_job_numbers(last_number)
+        return {'jobs': len(live), 'snapshot_lsn': snapshot_lsn, 'replayed': replayed}
+
+    @staticmethod
+    def _check_room(manager: PrintQueueManager, count: int):
+        if count > manager.capacity:
+            raise ValueError(f"the journal holds more jobs than the queue's capacity of {manager.capacity}")
+
+    @staticmethod
+    def _decode_job(payload: bytes, level: int | None = None) -> tuple[PrintJob, int]:
+        number, node, seq, enqueued_at, expiry_time, priority, created, user_length, title_length = \
+            _ENQUEUE.unpack_from(payload)
+        start = _ENQUEUE.size
+        user_id = payload[start:start + user_length].decode()
+        title = payload[start + user_length:start + user_length + title_length].decode()
+        job = PrintJob._restore(number, node, user_id, title, priority, created, expiry_time)
+        job._seq = seq
+        job.enqueued_at = enqueued_at
+        return job, seq
+
+    def _load_snapshot(self, manager: PrintQueueManager, path: str, live: dict) -> int:
+        """
+        Maps a snapshot file into memory and places its jobs in `manager`.
+        Returns:
+            int: The largest job seq in the snapshot.
+        """
+        with open(path, "rb") as snapshot_file, \
+                mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            magic, lsn, current_time, aged_at, count, last_seq, checksum = _SNAPSHOT_HEADER.unpack_from(data)
+            if magic != _SNAPSHOT_MAGIC or zlib.crc32(data[_SNAPSHOT_HEADER.size:]) != checksum:
+                raise ValueError(f"{path} is not a valid print queue snapshot")
+            self._check_room(manager, count)
+            manager.current_simulation_time = current_time
+            manager._aged_at = aged_at
+            records_end = _SNAPSHOT_HEADER.size + count * _SNAPSHOT_JOB.size
+            text = data[records_end:]
+            text_offset = 0
+            with memoryview(data) as view:
+                for (number, node, seq, enqueued_at, expiry_time, level, created,
+                     user_length, title_length) in _SNAPSHOT_JOB.iter_unpack(view[_SNAPSHOT_HEADER.size:records_end]):
+                    user_id = text[text_offset:text_offset + user_length].decode()
+                    text_offset += user_length
+                    title = text[text_offset:text_offset + title_length].decode()
+                    text_offset += title_length
+                    job = PrintJob._restore(number, node, user_id, title, level, created, expiry_time)
+                    job._seq = seq
+                    job.enqueued_at = enqueued_at
+                    manager._place_job(job)
+                    live[number] = job
+        return last_seq
+
+    # ======================================================================
+    # LOGGING
+    # The log_* methods are called by the manager while it holds its lock.
+    # ======================================================================
+
+    def _append(self, kind: int, payload: bytes):
+        with self._cond:
+            self._last_lsn += 1
+            body = _RECORD_BODY.pack(self._last_lsn, kind) + payload
+            self._buffer.append(_RECORD_HEADER.pack(len(payload), zlib.crc32(body)) + body)
+            self._since_snapshot += 1
+            self._cond.notify_all()
+
+    def enqueue_record(self, job: PrintJob) -> bytes:
+        """
+        Encodes the enqueue record of a stamped job without logging it, so the manager
+        can refuse a job the log cannot hold before it changes the queue.
+        Raises:
+            ValueError: If a field does not fit the record (e.g. an integer beyond 64 bits,
+                or a string that is not valid Unicode).
+        """
+        try:
+            user_id = job.user_id.encode()
+            title = job.title.encode()
+            return _ENQUEUE.pack(job._number, job._id_node(), job._seq, job.enqueued_at, job.expiry_time,
+                                 job.priority, job._created, len(user_id), len(title)) + user_id + title
+        except (struct.error, UnicodeError, AttributeError) as exc:
+            raise ValueError(f"job cannot be journaled: {exc}") from exc
+
+    def log_enqueue(self, job: PrintJob, record: bytes | None = None):
+        self._append(LOG_ENQUEUE, record if record is not None else self.enqueue_record(job))
+
+    def log_remove(self, job: PrintJob, status: str):
+        self._append(LOG_REMOVE, _REMOVE.pack(job._number, _STATUS_CODES[status]))
+
+    def log_reprioritize(self, job: PrintJob, priority: int):
+        """
+        Raises:
+            ValueError: If `priority` does not fit in 64 bits; nothing is logged.
+        """
+        try:
+            payload = _REPRIORITIZE.pack(job._number, priority)
+        except struct.error as exc:
+            raise ValueError(f"priority cannot be journaled: {exc}") from exc
+        self._append(LOG_REPRIORITIZE, payload)
+
+    def log_clock(self, current_time: int):
+        self._append(LOG_CLOCK, _TIME.pack(current_time))
+
+    def log_age(self, current_time: int):
+        self._append(LOG_AGE, _TIME.pack(current_time))
+
+    def log_age_until(self, target_time: int):
+        self._append(LOG_AGE_UNTIL, _TIME.pack(target_time))
+
+    def commit(self):
+        """
+        In sync mode, blocks until every record appended so far has been fsynced.
+        Called by the manager after it releases its lock.
+        Raises:
+            OSError: If the writer failed; the in-memory queue is then ahead of the log.
+        """
+        if not self.sync:
+            return
+        with self._cond:
+            target = self._last_lsn
+            self._cond.wait_for(lambda: self._durable_lsn >= target or self._error is not None or self._closed)
+            if self._error is not None:
+                raise OSError(f"print queue journal in {self.directory!r} failed") from self._error
+
+    # ======================================================================
+    # WRITER
+    # ======================================================================
+
+    def _open_segment(self, first_lsn: int):
+        if self._file is not None:
+            self._file.close()
+        self._file = open(self._segment_path(first_lsn), "ab")
+        self._segment_lsn = first_lsn
+        self._fsync_directory()
+
+    def _run_writer(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._buffer or self._rotate_requested or self._closed)
+                if self.commit_delay and self._buffer and not self._closed:
+                    self._cond.wait(self.commit_delay) # Let more records join this batch.
+                batch, self._buffer = self._buffer, []
+                batch_lsn = self._last_lsn
+                rotate, closing = self._rotate_requested, self._closed
+            try:
+                if batch:
+                    self._file.write(b"".join(batch))
+                    self._file.flush()
+                    os.fsync(self._file.fileno())
+                if rotate and batch_lsn + 1 != self._segment_lsn:
+                    self._open_segment(batch_lsn + 1)
+            except OSError as e:
+                with self._cond:
+                    self._error = e
+                    self._cond.notify_all()
+                return
+            with self._cond:
+                self._durable_lsn = batch_lsn
+                if batch:
+                    self.commits += 1
+                    self.records_written += len(batch)
+                if rotate:
+                    self._rotate_requested = False
+                start_snapshot = (self.snapshot_every and self._since_snapshot >= self.snapshot_every
+                                  and self._snapshot_thread is None and not closing)
+                if start_snapshot:
+                    self._snapshot_thread = threading.Thread(target=self._background_snapshot,
+                                                             name="print-queue-snapshot", daemon=True)
+                self._cond.notify_all()
+                if closing and not self._buffer:
+                    return
+            if start_snapshot:
+                self._snapshot_thread.start()
+
+    # ======================================================================
+    # SNAPSHOTS
+    # ======================================================================
+
+    def _background_snapshot(self):
+        try:
+            self.snapshot()
+        except OSError as e:
+            with self._cond:
+                self._error = e
+                self._cond.notify_all()
+        finally:
+            with self._cond:
+                self._snapshot_thread = None
+
+    def snapshot(self) -> int:
+        """
+        Writes a snapshot of the queued jobs and deletes the log segments and older
+        snapshots it makes redundant. The queue lock is held only while the jobs
+        are collected; encoding and writing happen outside it.
+        Returns:
+            int: The LSN the snapshot reflects.
+        """
+        manager = self._manager
+        if manager is None:
+            raise RuntimeError("the journal is not attached to a PrintQueueManager")
+        with self._snapshot_lock:
+            # Start a new log segment first, so that every older segment ends at or before the snapshot.
+            with self._cond:
+                self._rotate_requested = True
+                self._cond.notify_all()
+                self._cond.wait_for(lambda: not self._rotate_requested or self._closed or self._error is not None)
+            with manager.lock:
+                jobs = [(job, job._cohort.level) for job in manager._iter_ring()]
+                current_time, aged_at = manager.current_simulation_time, manager._aged_at
+                lsn = self._last_lsn # Records are appended under the manager lock, so `jobs` reflects exactly these.
+                self._since_snapshot = 0
+
+            records, text = [], []
+            last_seq = 0
+            for job, level in jobs:
+                user_id, title = job.user_id.encode(), job.title.encode()
+                records.append(_SNAPSHOT_JOB.pack(job._number, job._id_node(), job._seq, job.enqueued_at,
+                                                  job.expiry_time, level, job._created, len(user_id), len(title)))
+                text.append(user_id)
+                text.append(title)
+                last_seq = max(last_seq, job._seq)
+            body = b"".join(records) + b"".join(text)
+            header = _SNAPSHOT_HEADER.pack(_SNAPSHOT_MAGIC, lsn, current_time, aged_at, len(jobs), last_seq,
+                                           zlib.crc32(body))
+            path = self._snapshot_path(lsn)
+            with open(path + ".tmp", "wb") as snapshot_file:
+                snapshot_file.write(header)
+                snapshot_file.write(body)
+                snapshot_file.flush()
+                os.fsync(snapshot_file.fileno())
+            os.replace(path + ".tmp", path)
+            self._fsync_directory()
+            self.snapshots_written += 1
+
+            # Everything up to `lsn` is now in the snapshot.
+            for snapshot_lsn, old_path in self._listed("snapshot"):
+                if snapshot_lsn < lsn:
+                    os.remove(old_path)
+            segments = self._listed("wal")
+            for (_, segment_path), (next_first_lsn, _) in zip(segments, segments[1:]):
+                if next_first_lsn <= lsn + 1:
+                    os.remove(segment_path)
+            return lsn
+
+    def close(self):
+        """
+        Writes out the buffered records and stops the writer. The manager must not
+        be modified afterwards.
+        """
+        if self._closed or self._writer is None:
+            return
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._writer.join()
+        snapshot_thread = self._snapshot_thread
+        if snapshot_thread is not None:
+            snapshot_thread.join()
+        self._file.close()
+        if self._manager is not None and self._manager._journal is self:
+            self._manager._journal = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -3,7 +3,75 @@ import time
 from datetime import datetime
 import uuid
 import concurrent.futures
-from collections import deque 
+import heapq
+import itertools
+from collections import OrderedDict, deque 
+from print_queue_events import EventLog, INFO, WARNING, ERROR
+from print_queue_metrics import InstrumentedLock, QueueMetrics, format_prometheus
+from print_queue_snapshots import SnapshotView, CHANGE_ADDED, CHANGE_REMOVED, CHANGE_AGED, CHANGE_MOVED
+
+# Job status values. Jobs share these interned strings instead of holding their own copies.
+STATUS_WAITING = "waiting"
+STATUS_PRINTING = "printing"
+STATUS_COMPLETED = "completed"
+STATUS_EXPIRED = "expired"
+STATUS_EVICTED = "evicted" # Removed by an eviction overflow policy to make room for a new job.
+STATUS_SPILLED = "spilled" # Held in the overflow store until the queue has room.
+STATUS_CANCELLED = "cancelled" # Removed by cancel_job() or cancel_user_jobs().
+
+# Overflow policies: what enqueue_job() and enqueue_many() do with a new job when the queue is full.
+OVERFLOW_REJECT = "reject" # Reject the new job.
+OVERFLOW_BLOCK = "block" # Wait, up to the manager's block_timeout, for a job to leave the queue.
+OVERFLOW_EVICT_LOWEST = "evict_lowest" # Evict the newest least-urgent job, if the new job is more urgent than it.
+OVERFLOW_EVICT_OLDEST = "evict_oldest" # Evict the job that has been queued the longest.
+OVERFLOW_SPILL = "spill" # Hold the new job in an overflow store; it joins the queue once there is room.
+OVERFLOW_POLICIES = (OVERFLOW_REJECT, OVERFLOW_BLOCK, OVERFLOW_EVICT_LOWEST, OVERFLOW_EVICT_OLDEST, OVERFLOW_SPILL)
+
+_MIN_RING_SLOTS = 64 # The circular array never shrinks below this many slots (or the capacity, if smaller).
+
+_job_numbers = itertools.count(1) # Process-wide source of cheap, monotonic job numbers.
+_NODE_MASK = (1 << 64) - 1
+_JOB_ID_NODE = uuid.uuid4().int & _NODE_MASK # Random low 64 bits shared by the job IDs minted in this process.
+
+
+def _format_job_id(number: int, node: int) -> str:
+    """
+    Renders a job number as a UUID string: the node in the low 64 bits, and the
+    number XORed with the node in the high 64 bits. The low 32 bits of the number
+    come first and are mixed with the node's top bits, so the usual 8-character
+    short form differs between consecutive jobs and between processes and runs.
+    """
+    high = ((number & 0xFFFFFFFF) << 32) | (number >> 32 & 0xFFFFFFFF)
+    return str(uuid.UUID(int=((high ^ node) << 64) | node))
+
+
+def _parse_job_number(job_uuid: uuid.UUID) -> int:
+    """
+    Recovers the job number from a job ID rendered by _format_job_id().
+    """
+    value = job_uuid.int
+    high = (value >> 64) ^ (value & _NODE_MASK)
+    return (high >> 32) | ((high & 0xFFFFFFFF) << 32)
+
+
+def _reseed_job_id_node():
+    """
+    Gives this process its own job ID node. A forked process (such as a shard
+    server) inherits its parent's node and job numbers, so without this both
+    would mint the same job IDs.
+    """
+    global _JOB_ID_NODE
+    _JOB_ID_NODE = uuid.uuid4().int & _NODE_MASK
+
+
+def _reserve_job_numbers(last_number: int):
+    """
+    Makes sure that job numbers minted from now on are greater than `last_number`,
+    e.g. after jobs have been recovered from a journal.
+    """
+    global _job_numbers
+    _job_numbers = itertools.count(max(next(_job_numbers), last_number + 1))
+
 
 # This is the shared data class.
 class PrintJob:
@@ -11,16 +79,107 @@ class PrintJob:
     Represents a single print job with its metadata.
     This class stores details like user, title, priority, submission time,
     unique ID, current status, and simulated waiting time.
+    While a job is queued its waiting time is derived from the simulation time
+    at which it was enqueued, so advancing the clock does not touch every job.
+    Jobs use __slots__ and only render their UUID and creation datetime when asked.
     """
-    def __init__(self, user_id: str, title: str, priority: int = 5):
+    __slots__ = ("_number", "_job_id", "user_id", "title", "_priority", "_created", "status",
+                 "expiry_time", "enqueued_at", "_clock", "_waited", "_seq", "_slot", "_cohort")
+
+    def __init__(self, user_id: str, title: str, priority: int = 5, expiry_time: int | None = None):
         
-        self.job_id = str(uuid.uuid4())# A unique identifier for the print job, generated using UUID.
+        self._number = next(_job_numbers) # Monotonic integer identity; the UUID string is derived from it on demand.
+        self._job_id = None # Cached UUID string, rendered the first time job_id is read.
         self.user_id = user_id
         self.title = title # The title of the job.
-        self.priority = priority # The priority of the job (lower number = higher urgency).
-        self.created_at = datetime.now() # Timestamp when the job object was created.
-        self.status = "waiting" # The current status of the job.
-        self.waiting_time = 0.0 # Waiting initially set to 0 seconds
+        self._priority = priority # The priority of the job (lower number = higher urgency).
+        self._created = time.time() # Wall-clock timestamp when the job object was created.
+        self.status = STATUS_WAITING # The current status of the job.
+        self.expiry_time = expiry_time # Seconds the job may wait before expiring (None = use the queue default).
+        self.enqueued_at = 0 # Simulation time (seconds) at which the job entered the queue.
+        self._clock = None # The PrintQueueManager whose clock measures the wait while the job is queued.
+        self._waited = 0.0 # Waiting time recorded when the job left the queue (initially 0 seconds).
+        self._seq = 0 # Enqueue order assigned by the manager; used for tie-breaking between equal priorities.
+        self._slot = None # Index of the job's slot in the circular array while it is queued.
+        self._cohort = None # The aging cohort holding the job while it is queued; it owns the current priority.
+
+    @property
+    def job_id(self) -> str:
+        """
+        A unique identifier for the print job in UUID format, derived from the job number.
+        """
+        if self._job_id is None:
+            self._job_id = _format_job_id(self._number, _JOB_ID_NODE)
+        return self._job_id
+
+    def _id_node(self) -> int:
+        # The low 64 bits of the job ID: the node of the process that minted the job.
+        return _JOB_ID_NODE if self._job_id is None else int(self._job_id.replace("-", ""), 16) & _NODE_MASK
+
+    def __lt__(self, other: "PrintJob") -> bool:
+        # Jobs order by enqueue sequence, so a heap of queued jobs yields the oldest first.
+        return self._seq < other._seq
+
+    def __getstate__(self):
+        # Render the job ID before the job leaves this process: the receiving process has a different node.
+        self.job_id
+        return None, {name: getattr(self, name) for name in self.__slots__ if hasattr(self, name)}
+
+    @property
+    def created_at(self) -> datetime:
+        """
+        Timestamp when the job object was created.
+        """
+        return datetime.fromtimestamp(self._created)
+
+    @property
+    def priority(self) -> int:
+        """
+        The priority of the job (lower number = higher urgency).
+        While queued, the job's aging cohort holds the priority so that a whole
+        cohort can be promoted at once; setting it then goes through the queue's
+        reprioritize(), which moves the job to the cohort of its new level.
+        """
+        if self._cohort is not None:
+            return self._cohort.level
+        return self._priority
+
+    @priority.setter
+    def priority(self, value: int):
+        if self._cohort is not None:
+            self._clock.reprioritize(self.job_id, value) # While queued, _clock is the job's manager.
+        else:
+            self._priority = value
+
+    @property
+    def waiting_time(self) -> float:
+        """
+        Simulated seconds the job has spent waiting in the queue.
+        """
+        if self._clock is not None:
+            return float(self._clock.current_simulation_time - self.enqueued_at)
+        return self._waited
+
+    @classmethod
+    def _restore(cls, number: int, node: int, user_id: str, title: str, priority: int, created: float,
+                 expiry_time: int) -> "PrintJob":
+        """
+        Recreates a job recorded by a journal, keeping its number, job ID and creation time.
+        """
+        job = cls(user_id, title, priority, expiry_time)
+        job._number = number
+        job._created = created
+        if node != _JOB_ID_NODE:
+            job._job_id = _format_job_id(number, node) # Minted by an earlier process.
+        return job
+
+    def _leave_queue(self, status: str):
+        """
+        Freezes the waiting time and sets the final status once the job is removed from the queue.
+        """
+        self._waited = self.waiting_time
+        self._clock = None
+        self.status = status
 
     def __str__(self):
         """
@@ -32,29 +191,337 @@ class PrintJob:
                 f"Status: {self.status}, Waiting: {self.waiting_time:.1f}s")
 
 
+class _IndexedHeap:
+    """
+    A binary min-heap of objects that also keeps an index from each object to its
+    heap entry, so one can be re-keyed or removed without a linear scan. The
+    manager keeps its aging cohorts in one, ordered by their oldest jobs; the
+    per-job structures below avoid the cost of an entry and index slot per job.
+    Removed entries are marked invalid and skipped lazily (see the heapq docs,
+    "Priority Queue Implementation Notes"); the heap is rebuilt once stale
+    entries outnumber live ones. Entries carry an insertion count, so a job
+    removed and pushed again under the same key never compares with its stale entry.
+    """
+    def __init__(self, key):
+        self._key = key # Callable returning the ordering tuple for a job.
+        self._heap = [] # List of [key, insertion count, job] entries maintained with heapq.
+        self._pushes = itertools.count() # Insertion counter; breaks ties between equal keys.
+        self._entries = {} # Maps each live job to its current heap entry.
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, job):
+        return job in self._entries
+
+    def __iter__(self):
+        return iter(self._entries)
+
+    def push(self, job):
+        """
+        Adds a job to the heap, or re-keys it if it is already present.
+        """
+        if job in self._entries:
+            self._invalidate(job)
+        entry = [self._key(job), next(self._pushes), job]
+        self._entries[job] = entry
+        heapq.heappush(self._heap, entry)
+
+    def discard(self, job):
+        """
+        Removes a job from the heap if it is present.
+        """
+        if job in self._entries:
+            self._invalidate(job)
+
+    def peek(self):
+        """
+        Returns the job with the smallest key without removing it, or None if empty.
+        """
+        self._drop_stale()
+        return self._heap[0][2] if self._heap else None
+
+    def pop(self):
+        """
+        Removes and returns the job with the smallest key, or None if empty.
+        """
+        self._drop_stale()
+        if not self._heap:
+            return None
+        job = heapq.heappop(self._heap)[2]
+        del self._entries[job]
+        return job
+
+    def _invalidate(self, job):
+        entry = self._entries.pop(job)
+        entry[2] = None # Mark the entry stale; it is discarded when it reaches the top.
+        if len(self._heap) > 64 and len(self._heap) > 2 * len(self._entries):
+            self._heap = [e for e in self._heap if e[2] is not None]
+            heapq.heapify(self._heap)
+
+    def _drop_stale(self):
+        while self._heap and self._heap[0][2] is None:
+            heapq.heappop(self._heap)
+
+class _AgingCohort:
+    """
+    The queued jobs that share a priority level and an aging phase
+    (enqueued_at % aging_interval), ordered by enqueue order. All of them are
+    due for aging on the same ticks, so the whole cohort is promoted by
+    changing its level instead of updating each job.
+
+    The jobs themselves form the heap (jobs order by enqueue sequence), so a
+    job costs one list slot. A job belongs to the cohort while its `_cohort`
+    points to it; entries of jobs that have left are skipped lazily, and the
+    heap is rebuilt once they outnumber live ones. A job that leaves and later
+    rejoins may have two entries; both carry the same key.
+    """
+    def __init__(self, level: int, phase: int | None):
+        self.level = level # The priority shared by every job in the cohort.
+        self.phase = phase # The aging phase of the cohort (None for the priority-1 cohort, which never ages).
+        self._heap = [] # Jobs (plus stale entries of jobs that have left), a min-heap in enqueue order.
+        self._size = 0 # Number of jobs in the cohort.
+        # (-seq, job) entries, newest first, or None until newest() is first called. Only the
+        # "evict_lowest" policy asks for the newest job, so other queues never pay for a second heap.
+        # Jobs can join out of enqueue order (when reprioritized, or merged into the priority-1
+        # cohort), so the newest job cannot be tracked by push order alone.
+        self._by_newest = None
+
+    def __len__(self):
+        return self._size
+
+    def __contains__(self, job):
+        return job._cohort is self
+
+    def __iter__(self):
+        if len(self._heap) == self._size: # No stale or duplicate entries.
+            return iter(list(self._heap))
+        return iter([job for job in dict.fromkeys(self._heap) if job._cohort is self])
+
+    def push(self, job):
+        """
+        Adds a job that is not in the cohort, and points the job at the cohort.
+        """
+        job._cohort = self
+        self._size += 1
+        heapq.heappush(self._heap, job)
+        if self._by_newest is not None:
+            heapq.heappush(self._by_newest, (-job._seq, job))
+
+    def discard(self, job):
+        """
+        Removes a job from the cohort if it is in it, clearing the job's `_cohort`.
+        """
+        if job._cohort is not self:
+            return
+        job._cohort = None
+        self._size -= 1
+        limit = 2 * self._size + 64
+        if len(self._heap) > limit or (self._by_newest is not None and len(self._by_newest) > limit):
+            self._heap = [job for job in dict.fromkeys(self._heap) if job._cohort is self]
+            heapq.heapify(self._heap)
+            if self._by_newest is not None:
+                self._by_newest = [(-job._seq, job) for job in self._heap]
+                heapq.heapify(self._by_newest)
+
+    def peek(self):
+        """
+        Returns the earliest-enqueued job in the cohort without removing it, or None if empty.
+        """
+        heap = self._heap
+        while heap and heap[0]._cohort is not self:
+            heapq.heappop(heap)
+        return heap[0] if heap else None
+
+    def newest(self):
+        """
+        Returns the most recently enqueued job in the cohort in O(log n) amortised, or None if empty.
+        The first call builds the newest-first heap in O(n); it is maintained from then on.
+        """
+        if self._by_newest is None:
+            self._by_newest = [(-job._seq, job) for job in self]
+            heapq.heapify(self._by_newest)
+        heap = self._by_newest
+        while heap and heap[0][1]._cohort is not self:
+            heapq.heappop(heap)
+        return heap[0][1] if heap else None
+
+
+class _ExpiryIndex:
+    """
+    The queued jobs ordered by the simulation time at which they expire
+    (enqueued_at + expiry_time, then enqueue order), so each tick only looks at
+    the due ones. Jobs with the same expiry time expire in the order they were
+    enqueued, so those sharing the expiry time of the first job indexed (the
+    queue default, typically) wait in a FIFO at one deque slot per job. Any
+    other job goes to a heap of (deadline, seq, job) entries. A job is live
+    while it holds a slot in the circular array; entries of jobs that have left
+    are skipped lazily, and both are rebuilt once they outnumber live ones.
+    """
+    def __init__(self):
+        self._fifo = deque() # Jobs with the FIFO's expiry time, in deadline order.
+        self._fifo_expiry = None # The expiry time (s) shared by the jobs in the FIFO.
+        self._heap = [] # (deadline, seq, job) entries of every other job.
+        self._size = 0 # Number of live jobs.
+
+    def __len__(self):
+        return self._size
+
+    def push(self, job):
+        """
+        Adds a queued job (its `_slot` must be set).
+        """
+        self._size += 1
+        fifo = self._fifo
+        if self._fifo_expiry is None:
+            self._fifo_expiry = job.expiry_time
+        if job.expiry_time == self._fifo_expiry:
+            if not fifo:
+                fifo.append(job)
+                return
+            last = fifo[-1]
+            if (last.enqueued_at, last._seq) <= (job.enqueued_at, job._seq):
+                fifo.append(job)
+                return
+        heapq.heappush(self._heap, (job.enqueued_at + job.expiry_time, job._seq, job))
+
+    def discard(self, job):
+        """
+        Forgets a job that has just left the queue (its `_slot` is already None).
+        """
+        self._size -= 1
+        if len(self._fifo) + len(self._heap) > 2 * self._size + 64:
+            self._fifo = deque(job for job in self._fifo if job._slot is not None)
+            self._heap = [entry for entry in self._heap if entry[2]._slot is not None]
+            heapq.heapify(self._heap)
+
+    def peek(self):
+        """
+        Returns the job that expires first without removing it, or None if empty.
+        """
+        fifo, heap = self._fifo, self._heap
+        while fifo and fifo[0]._slot is None:
+            fifo.popleft()
+        while heap and heap[0][2]._slot is None:
+            heapq.heappop(heap)
+        if not heap:
+            return fifo[0] if fifo else None
+        if fifo:
+            first = fifo[0]
+            if (first.enqueued_at + first.expiry_time, first._seq) < heap[0][:2]:
+                return first
+        return heap[0][2]
+
+
 class PrintQueueManager:
     """
     Manages a print queue system, handling job submissions, prioritization,
     and concurrent operations in a simulated environment. It uses a circular
     array structure for the queue.
     """
-    def __init__(self, capacity: int = 10, expiry_time: int = 300, aging_interval: int = 5):
+    def __init__(self, capacity: int = 10, expiry_time: int = 300, aging_interval: int = 5, submission_workers: int = 5,
+                 event_log: EventLog | None = None, journal=None, overflow: str = OVERFLOW_REJECT,
+                 block_timeout: float | None = None, overflow_limit: int | None = None):
+        """
+        Args:
+            capacity (int): Maximum number of jobs the queue can hold. Storage grows and
+                shrinks with the number of queued jobs, up to twice this many slots.
+            expiry_time (int): Default time in seconds for job expiry.
+            aging_interval (int): Interval in seconds at which job priorities are aged.
+            submission_workers (int): Worker threads in the shared submission executor.
+            event_log (EventLog | None): Where queue events are logged; defaults to the console.
+            journal (print_queue_journal.Journal | None): Makes the queue durable. Jobs recorded in
+                the journal's directory are recovered first, then every change is logged to it.
+            overflow (str): What happens to a new job when the queue is full; one of OVERFLOW_POLICIES.
+            block_timeout (float | None): Seconds the "block" policy waits for room; None waits indefinitely.
+            overflow_limit (int | None): Jobs the "spill" policy may hold in its overflow store; None is unbounded.
+        Raises:
+            ValueError: If `capacity` is less than 1, or `overflow` is not a known policy.
+        """
+        if capacity < 1:
+            # A queue that can never hold a job would make every overflow policy meaningless.
+            raise ValueError(f"capacity must be at least 1, got {capacity!r}")
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"unknown overflow policy {overflow!r}; expected one of {OVERFLOW_POLICIES}")
         # --- Core Queue Attributes ---
         
         self.capacity = capacity # Maximum number of jobs the queue can hold.
-        self.queue = [None] * capacity # The underlying circular array storage for print jobs.
+        self.queue = [None] * min(capacity, _MIN_RING_SLOTS) # The underlying circular array storage for print jobs; resized as the queue grows and shrinks.
         self.front = 0  # Index of the first (oldest) job in the queue.
         self.rear = 0  # Index where the next job will be added.
         self.size = 0 # Current number of jobs in the queue.
-        self.lock = threading.Lock() # A threading.Lock to ensure thread-safe access to the queue for modifications.
+        self.lock = InstrumentedLock() # A threading.Lock, instrumented for get_metrics(), to ensure thread-safe access to the queue for modifications.
+        self.job_available = threading.Condition(self.lock) # Signalled whenever a job is added, for blocking consumers.
+        self.space_available = threading.Condition(self.lock) # Signalled whenever a job leaves, for blocked producers.
+        self._job_listeners = [] # Callables run (outside the lock) after jobs are added; see add_job_listener().
+        self._space_listeners = [] # Callables run (under the lock) when a job frees a slot; see add_space_listener().
+
+        # Jobs removed out of arrival order leave an empty slot (None) in the circular array
+        # instead of forcing a rebuild, so the occupied span can be larger than `size`.
+        self._ring_span = 0 # Number of slots between front and rear, including empty ones.
+        self._enqueue_seq = itertools.count() # Monotonic enqueue counter used for tie-breaking; shards share one.
+        # Jobs ordered by the simulation time at which they expire, so each tick only pops the due ones.
+        self._expiry_index = _ExpiryIndex()
+        # Multi-level priority buckets: {priority level: {aging phase: _AgingCohort}}. A job is only
+        # due for aging on ticks where its waiting time is a multiple of the interval, i.e. when
+        # current_simulation_time % aging_interval equals its phase, so aging moves whole cohorts.
+        self._levels = {}
+        # The non-empty cohorts ordered by (level, enqueue order of their oldest job), so the
+        # next job to print is the oldest job of the top cohort. Re-keyed when a cohort is
+        # promoted or its oldest job changes.
+        self._cohort_heads = _IndexedHeap(key=lambda cohort: (cohort.level, cohort.peek()._seq))
+        self._aged_at = 0 # Simulation time at which priority aging was last applied.
+
+        # --- Overflow Attributes ---
+        self.overflow = overflow # Policy applied when a job arrives at a full queue.
+        self.block_timeout = block_timeout # Seconds the "block" policy waits for room.
+        self.overflow_limit = overflow_limit # Maximum size of the overflow store used by the "spill" policy.
+        # Spilled jobs, oldest first; each joins the queue as soon as a job leaves it. Keyed by job so a
+        # spilled job can be cancelled in O(1).
+        self._overflow = OrderedDict()
+
+        # --- Job Index Attributes ---
+        # Queued and spilled jobs, indexed so they can be looked up, cancelled and reprioritized without a scan.
+        self._jobs_by_number = {} # Job number (recoverable from the job ID) -> job.
+        self._jobs_by_user = {} # User ID -> {job: None}, that user's jobs in submission order.
 
         # --- Simulation Attributes ---
         self.current_simulation_time = 0 # Tracks the current simulated time in seconds.
         self.default_expiry_time_seconds = expiry_time # Default time in seconds for job expiry.
         self.priority_aging_interval = aging_interval # Interval in seconds at which job priorities are aged (made more urgent).
 
-        print(f"[{self.current_simulation_time}s] INFO: PrintQueueManager initialized with capacity={capacity}, "
-              f"expiry={expiry_time}s, aging_interval={aging_interval}s.")
+        # --- Concurrent Submission Attributes ---
+        self.submission_workers = submission_workers # Worker threads in the shared submission executor.
+        self._executor = None # Long-lived ThreadPoolExecutor, created on first use by submit_job().
+        self._executor_lock = threading.Lock() # Guards lazy creation and shutdown of the executor.
+
+        # --- Event Logging Attributes ---
+        # Events are recorded while holding the lock but only written out by dispatch() after it is
+        # released (or by the log's background writer), so no terminal I/O happens inside the lock.
+        self.events = event_log if event_log is not None else EventLog()
+
+        # --- Metrics Attributes ---
+        # Updated while holding the lock, at the cost of a few additions per operation; see get_metrics().
+        self.metrics = QueueMetrics()
+
+        # --- Snapshot Attributes ---
+        # Every change to the queued jobs bumps the version. Once a reader has asked for a snapshot,
+        # changes are also appended to a change log, which readers replay into a SnapshotView
+        # outside the queue lock (see get_queue_snapshot() and changes_since()).
+        self._version = 0 # Number of changes made to the queued jobs so far.
+        self._change_log = None # Changes not yet replayed into the view; None while nobody is reading.
+        self._change_log_limit = max(10_000, capacity) # Beyond this many pending changes the view is rebuilt instead.
+        self._view = SnapshotView() # Replica of the queued jobs that snapshots are built from.
+        self._view_lock = threading.Lock() # Serialises readers of the view; writers never take it.
+
+        # --- Durability Attributes ---
+        self._journal = None # The Journal changes are logged to; attached once it has recovered the queue.
+
+        self.events.emit(INFO, "manager_initialized", self.current_simulation_time,
+                         capacity=capacity, expiry_time=expiry_time, aging_interval=aging_interval)
+        self.events.dispatch()
+        if journal is not None:
+            journal.open(self)
 
 
     # ======================================================================
@@ -79,22 +546,344 @@ class PrintQueueManager:
         """
         return self.size == 0
 
-    def enqueue_job(self, user_id: str, title: str, priority: int = 5) -> bool:
+    def __len__(self) -> int:
+        """
+        Returns the number of jobs currently in the queue.
+        """
+        return self.size
+
+    def _iter_ring(self):
+        """
+        Yields the queued jobs in arrival order, skipping empty slots.
+        Must be called while holding `self.lock`.
+        """
+        queue = self.queue
+        slots = len(queue)
+        for i in range(self._ring_span):
+            job = queue[(self.front + i) % slots]
+            if job is not None:
+                yield job
+
+    def _ring_append(self, job: PrintJob):
+        """
+        Places a job in the next free slot at the rear of the circular array.
+        If the occupied span has reached the end of the array, the array is
+        reallocated at twice the number of queued jobs (capped at twice the
+        capacity), which both compacts away empty slots left by earlier removals
+        and gives room to grow; resizes are O(n) but amortised O(1) per job. The
+        slack matters for a full queue: capped at the capacity itself, a single
+        slot freed mid-queue would force a compaction on every append.
+        """
+        if self._ring_span == len(self.queue):
+            self._resize_ring(min(2 * self.capacity, max(_MIN_RING_SLOTS, 2 * self.size)))
+        job._slot = self.rear
+        self.queue[self.rear] = job
+        self.rear = (self.rear + 1) % len(self.queue)
+        self._ring_span += 1
+        self.size += 1
+
+    def _ring_remove(self, job: PrintJob):
+        """
+        Clears a job's slot in the circular array in O(1). Empty slots at either
+        end of the occupied span are reclaimed by moving front/rear inwards. Once
+        the array is no more than a quarter full it is halved.
+        """
+        queue = self.queue
+        slots = len(queue)
+        queue[job._slot] = None
+        job._slot = None
+        self.size -= 1
+        while self._ring_span and queue[self.front] is None:
+            self.front = (self.front + 1) % slots
+            self._ring_span -= 1
+        while self._ring_span and queue[(self.rear - 1) % slots] is None:
+            self.rear = (self.rear - 1) % slots
+            self._ring_span -= 1
+        if slots > _MIN_RING_SLOTS and self.size <= slots // 4:
+            self._resize_ring(max(_MIN_RING_SLOTS, slots // 2))
+
+    def _resize_ring(self, slots: int):
+        """
+        Rewrites the circular array with `slots` slots so the queued jobs occupy
+        contiguous slots starting at index 0, preserving arrival order.
+        """
+        jobs = list(self._iter_ring())
+        self.queue = [None] * slots
+        for slot, job in enumerate(jobs):
+            self.queue[slot] = job
+            job._slot = slot
+        self.front = 0
+        self.rear = len(jobs) % slots
+        self._ring_span = len(jobs)
+
+    def _cohort_for(self, level: int, phase: int) -> _AgingCohort:
+        """
+        Returns the cohort for a priority level and aging phase, creating it if needed.
+        Jobs at priority 1 can never age further, so they all share one cohort.
+        """
+        if level == 1:
+            phase = None
+        cohorts = self._levels.setdefault(level, {})
+        cohort = cohorts.get(phase)
+        if cohort is None:
+            cohort = cohorts[phase] = _AgingCohort(level, phase)
+        return cohort
+
+    def _next_job(self) -> PrintJob:
+        """
+        Returns the job that should be printed next without removing it: the
+        earliest-enqueued job in the lowest non-empty priority level. Every waiting
+        job's waiting time grows at the same rate, so among equal priorities the job
+        enqueued first is the one that has waited the longest.
+        """
+        return self._cohort_heads.peek().peek()
+
+    def _rekey_cohort(self, cohort: _AgingCohort):
+        """
+        Updates a cohort's place among the cohort heads after its level or its oldest
+        job has changed, or drops it once it is empty.
+        Must be called while holding `self.lock`.
+        """
+        if cohort:
+            self._cohort_heads.push(cohort)
+        else:
+            self._cohort_heads.discard(cohort)
+
+    def _remove_job(self, job: PrintJob, status: str):
+        """
+        Detaches a job from the circular array, its aging cohort and the expiry index,
+        and gives it its final status. The job keeps the priority and waiting time it
+        had when it left the queue.
+        """
+        self._ring_remove(job)
+        self._expiry_index.discard(job)
+        job._priority = self._detach_from_cohort(job)
+        self._unindex_job(job)
+        job._leave_queue(status)
+        self._record_change(CHANGE_REMOVED, job)
+        if self._journal is not None:
+            self._journal.log_remove(job, status)
+        if self._overflow:
+            self._insert_job(self._overflow.popitem(last=False)[0]) # The oldest spilled job takes the freed slot.
+        else:
+            self.space_available.notify() # Wake one producer blocked in enqueue_job(), if any.
+            if self._space_listeners:
+                self._run_listeners(self._space_listeners)
+
+    def _detach_from_cohort(self, job: PrintJob) -> int:
+        """
+        Removes a job from its aging cohort, dropping the cohort once it is empty.
+        Returns:
+            int: The job's priority level.
+        """
+        cohort = job._cohort
+        was_head = cohort.peek() is job
+        cohort.discard(job)
+        if not cohort:
+            cohorts = self._levels[cohort.level]
+            del cohorts[cohort.phase]
+            if not cohorts:
+                del self._levels[cohort.level]
+        if was_head:
+            self._rekey_cohort(cohort)
+        return cohort.level
+
+    def _index_job(self, job: PrintJob):
+        self._jobs_by_number[job._number] = job
+        self._jobs_by_user.setdefault(job.user_id, {})[job] = None
+
+    def _unindex_job(self, job: PrintJob):
+        del self._jobs_by_number[job._number]
+        user_jobs = self._jobs_by_user[job.user_id]
+        del user_jobs[job]
+        if not user_jobs:
+            del self._jobs_by_user[job.user_id]
+
+    def _find_job(self, job_id: str) -> PrintJob | None:
+        """
+        Looks up a queued or spilled job by its job ID in O(1).
+        Must be called while holding `self.lock`.
+        """
+        try:
+            job_uuid = uuid.UUID(job_id)
+        except (TypeError, ValueError, AttributeError):
+            return None
+        job = self._jobs_by_number.get(_parse_job_number(job_uuid))
+        if job is None or job.job_id != str(job_uuid): # Same number, but minted by another process.
+            return None
+        return job
+
+    def _commit(self):
+        """
+        Waits until the changes made so far are durable, if a synchronous journal is attached.
+        Call this after releasing `self.lock`.
+        """
+        if self._journal is not None:
+            self._journal.commit()
+
+    def _record_change(self, kind: str, *details):
+        """
+        Bumps the version and, while the change log is active, logs the change for the snapshot view.
+        Must be called while holding `self.lock`.
+        """
+        self._version += 1
+        change_log = self._change_log
+        if change_log is not None:
+            if len(change_log) >= self._change_log_limit:
+                # No reader has caught up for a long time; the next one rebuilds the view instead.
+                self._change_log = None
+            else:
+                change_log.append((self._version, kind, *details))
+
+    def enqueue_job(self, user_id: str, title: str, priority: int = 5, expiry_time: int | None = None) -> bool:
         """
         Adds a new print job to the back of the queue. Its also thread-safe.
-            bool: True if the job was successfully enqueued, False if the queue is full.
+        If the queue is full, the manager's overflow policy decides what happens.
+        Args:
+            expiry_time (int | None): Per-job expiry override in seconds; defaults to the queue's expiry time.
+        Returns:
+            bool: True if the job was accepted (enqueued, or spilled to the overflow store), False if it was
+                rejected, including when its fields are invalid (see enqueue_many()).
+        """
+        new_jobs = self._build_jobs([(user_id, title, priority, expiry_time)])
+        return self._enqueue(new_jobs, self._block_deadline(), "enqueue")[0]
+
+    def _enqueue(self, new_jobs: list, deadline: float | None, operation: str, wait: bool = True) -> list[bool]:
         """
+        Admits jobs in order under a single acquisition of the queue lock, then
+        dispatches events, commits and notifies job listeners.
+        Args:
+            new_jobs (list[PrintJob | None]): The jobs to add; None marks an invalid entry, which is rejected.
+            deadline (float | None): time.monotonic() value after which the "block" policy gives up.
+            operation (str): The latency histogram the call is recorded in.
+            wait (bool): If False, stops at the first job the "block" policy would have to wait
+                for, so callers that must not block (such as the asyncio front-end) can wait
+                for room their own way.
+        Returns:
+            list[bool]: For each job admitted or rejected, True if it was accepted. With wait=False
+                the list stops short of `new_jobs` at the first job that would have waited.
+        """
+        results = []
+        started = time.perf_counter()
         with self.lock: # Acquire lock to ensure thread safety during queue modification
-            if self.is_full():
-                print(f"[{self.current_simulation_time}s] ERROR: Queue is full. Cannot add job '{title}'.")
-                return False
+            for new_job in new_jobs:
+                if new_job is None:
+                    self.metrics.jobs_invalid += 1
+                    results.append(False)
+                elif not wait and self.overflow == OVERFLOW_BLOCK and self.is_full():
+                    break
+                else:
+                    try:
+                        results.append(self._admit_job(new_job, deadline))
+                    except ValueError as exc: # The journal cannot record the job; the queue is unchanged.
+                        self.events.emit(ERROR, "job_invalid", self.current_simulation_time,
+                                         job_info=(new_job.user_id, new_job.title, new_job.priority,
+                                                   new_job.expiry_time), reason=exc)
+                        self.metrics.jobs_invalid += 1
+                        results.append(False)
+            self.metrics.latency[operation].observe(time.perf_counter() - started)
+        self.events.dispatch()
+        self._commit()
+        if any(results):
+            self._notify_job_listeners()
+        return results
+
+    def _block_deadline(self) -> float | None:
+        # The time.monotonic() deadline for the "block" policy, taken before waiting for the lock.
+        if self.overflow == OVERFLOW_BLOCK and self.block_timeout is not None:
+            return time.monotonic() + self.block_timeout
+        return None
+
+    def _admit_job(self, new_job: PrintJob, deadline: float | None) -> bool:
+        """
+        Inserts a new job, applying the overflow policy if the queue is full.
+        Must be called while holding `self.lock`.
+        Args:
+            new_job (PrintJob): The job to add.
+            deadline (float | None): time.monotonic() value after which the "block" policy gives up.
+        Returns:
+            bool: True if the job was enqueued or spilled, False if it was rejected.
+        Raises:
+            ValueError: If the journal cannot record the job; nothing is evicted or spilled.
+        """
+        if new_job.expiry_time is None:
+            new_job.expiry_time = self.default_expiry_time_seconds
+        if self.is_full():
+            if self._journal is not None:
+                # A job that evicts another, or waits in the overflow store, must be known to be loggable first.
+                self._journal.enqueue_record(new_job)
+            policy = self.overflow
+            if policy == OVERFLOW_BLOCK:
+                timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+                self.space_available.wait_for(lambda: not self.is_full(), timeout)
+            elif policy == OVERFLOW_SPILL:
+                if self.overflow_limit is None or len(self._overflow) < self.overflow_limit:
+                    new_job.status = STATUS_SPILLED
+                    self._overflow[new_job] = None
+                    self._index_job(new_job)
+                    self.metrics.jobs_spilled += 1
+                    self.events.emit(WARNING, "job_spilled", self.current_simulation_time, job=new_job,
+                                     overflow=len(self._overflow))
+                    return True
+            elif policy == OVERFLOW_EVICT_OLDEST:
+                self._evict_job(self.queue[self.front], new_job) # The front slot always holds the oldest job.
+            elif policy == OVERFLOW_EVICT_LOWEST:
+                lowest_level = max(self._levels)
+                if new_job.priority < lowest_level: # Only a more urgent job may take a queued job's slot.
+                    # The job print_job() would reach last: the newest one at the least urgent level.
+                    victim = max((cohort.newest() for cohort in self._levels[lowest_level].values()),
+                                 key=lambda job: job._seq)
+                    self._evict_job(victim, new_job)
+        if self.is_full():
+            self.events.emit(ERROR, "job_rejected", self.current_simulation_time, title=new_job.title)
+            self.metrics.jobs_rejected += 1
+            return False
+        self._insert_job(new_job)
+        return True
+
+    def _evict_job(self, victim: PrintJob, new_job: PrintJob):
+        # Must be called while holding `self.lock`.
+        self._remove_job(victim, STATUS_EVICTED)
+        self.metrics.jobs_evicted += 1
+        self.events.emit(WARNING, "job_evicted", self.current_simulation_time, job=victim, title=new_job.title)
+
+    def _insert_job(self, new_job: PrintJob):
+        """
+        Stamps a new job with the current simulation time and adds it to the
+        circular array, the expiry index and its aging cohort.
+        Must be called while holding `self.lock` with room in the queue.
+        Raises:
+            ValueError: If the journal cannot record the job; the queue is left unchanged.
+        """
+        new_job.status = STATUS_WAITING
+        new_job._seq = next(self._enqueue_seq)
+        new_job.enqueued_at = self.current_simulation_time
+        # Encode the journal record before touching the queue, so a job it cannot hold is refused cleanly.
+        record = self._journal.enqueue_record(new_job) if self._journal is not None else None
+        self._place_job(new_job)
+        self.metrics.jobs_enqueued += 1
+        if self.size > self.metrics.max_depth:
+            self.metrics.max_depth = self.size
+        if record is not None:
+            self._journal.log_enqueue(new_job, record)
+        self.job_available.notify() # Wake one printer blocked in take_job(), if any.
+        self.events.emit(INFO, "job_enqueued", self.current_simulation_time, job=new_job, size=self.size, capacity=self.capacity)
 
-            new_job = PrintJob(user_id, title, priority)
-            self.queue[self.rear] = new_job
-            self.rear = (self.rear + 1) % self.capacity
-            self.size += 1
-            print(f"[{self.current_simulation_time}s] INFO: Job '{new_job.title}' (ID: {new_job.job_id[:8]}...) added to queue. (Size: {self.size}/{self.capacity})")
-            return True
+    def _place_job(self, job: PrintJob):
+        """
+        Adds a stamped job (its `_seq`, `enqueued_at` and `expiry_time` are set) to the
+        circular array, the expiry index and its aging cohort. Also used to restore
+        jobs from a journal. Must be called while holding `self.lock` with room in the queue.
+        """
+        job._clock = self
+        self._ring_append(job)
+        self._expiry_index.push(job)
+        cohort = self._cohort_for(job.priority, job.enqueued_at % self.priority_aging_interval)
+        cohort.push(job)
+        if cohort.peek() is job:
+            self._rekey_cohort(cohort)
+        self._index_job(job)
+        self._record_change(CHANGE_ADDED, job, cohort, cohort.level)
 
     def print_job(self) -> PrintJob | None:
         """
@@ -102,43 +891,221 @@ class PrintQueueManager:
         Returns:
             PrintJob | None: The PrintJob object that was printed, or None if the queue is empty.
         """
+        started = time.perf_counter()
         with self.lock: 
             if self.is_empty():
-                print(f"[{self.current_simulation_time}s] INFO: No jobs in queue to print.")
+                self.events.emit(INFO, "queue_empty", self.current_simulation_time)
+                job_to_print = None
+            else:
+                job_to_print = self._next_job()
+                self._print(job_to_print)
+            self.metrics.latency["print"].observe(time.perf_counter() - started)
+        self.events.dispatch()
+        self._commit()
+        return job_to_print
+
+    def print_job_if_next(self, key: tuple) -> PrintJob | None:
+        """
+        Prints the next job only if its peek_next() key is still `key`. A caller
+        that chose this queue by peeking (such as ShardedPrintQueueManager) thus
+        never prints a different job from the one it compared, even if another
+        consumer got there first.
+        Args:
+            key (tuple): The key returned by peek_next().
+        Returns:
+            PrintJob | None: The printed job, or None if the queue's next job has changed.
+        """
+        started = time.perf_counter()
+        with self.lock:
+            job_to_print = None
+            if not self.is_empty():
+                job = self._next_job()
+                if (job.priority, job._seq) == tuple(key):
+                    job_to_print = job
+                    self._print(job)
+            self.metrics.latency["print"].observe(time.perf_counter() - started)
+        self.events.dispatch()
+        self._commit()
+        return job_to_print
+
+    def _print(self, job: PrintJob):
+        # Removes the job and updates its status to printed. Must be called while holding `self.lock`.
+        self._remove_job(job, STATUS_COMPLETED)
+        self._record_printed(job)
+        self.events.emit(INFO, "job_printed", self.current_simulation_time, job=job, size=self.size)
+
+    def _record_printed(self, job: PrintJob):
+        # Must be called while holding `self.lock`.
+        self.metrics.jobs_printed += 1
+        self.metrics.wait_time.observe(job.waiting_time)
+
+    def peek_next(self) -> tuple | None:
+        """
+        Returns the ordering key of the job print_job() would print next, without removing it.
+        Queues that share one enqueue sequence (such as the shards of a
+        ShardedPrintQueueManager) can compare these keys with each other.
+        Returns:
+            tuple | None: (priority, enqueue sequence number), or None if the queue is empty.
+        """
+        with self.lock:
+            if self.is_empty():
                 return None
+            job = self._next_job()
+            return (job.priority, job._seq)
+
+    def add_job_listener(self, callback):
+        """
+        Registers a callable that is run with no arguments, outside the lock, whenever
+        jobs have been added to the queue. Used by consumers that cannot block on
+        `job_available`, such as the asyncio front-end. Exceptions it raises are
+        logged as "listener_failed" events and otherwise ignored.
+        """
+        self._job_listeners.append(callback)
+
+    def remove_job_listener(self, callback):
+        """
+        Unregisters a callable added with add_job_listener().
+        """
+        self._job_listeners.remove(callback)
+
+    def _notify_job_listeners(self):
+        if self._job_listeners and not self._run_listeners(self._job_listeners):
+            self.events.dispatch() # Write out the listener_failed events.
+
+    def _run_listeners(self, listeners: list) -> bool:
+        """
+        Runs each listener, logging (not raising) any exception, so that a faulty
+        listener cannot break the queue operation that triggered it.
+        Returns:
+            bool: True if every listener returned normally.
+        """
+        ok = True
+        for callback in list(listeners):
+            try:
+                callback()
+            except Exception as exc:
+                ok = False
+                self.events.emit(ERROR, "listener_failed", self.current_simulation_time, callback=callback, error=exc)
+        return ok
 
-            
-            active_jobs = [self.queue[(self.front + i) % self.capacity] for i in range(self.size) if self.queue[(self.front + i) % self.capacity] is not None]
+    def add_space_listener(self, callback):
+        """
+        Registers a callable that is run with no arguments whenever a job leaves a
+        full queue's slot free. Used by producers that cannot block on
+        `space_available`, such as the asyncio front-end. It runs while the queue
+        lock is held, on whichever thread removed the job, so it must return
+        quickly and must not call back into the manager. Exceptions it raises are
+        logged as "listener_failed" events and otherwise ignored.
+        """
+        self._space_listeners.append(callback)
 
-            
-            if not active_jobs:
-                print(f"[{self.current_simulation_time}s] INFO: No valid jobs found in queue after internal check.")
+    def remove_space_listener(self, callback):
+        """
+        Unregisters a callable added with add_space_listener().
+        """
+        self._space_listeners.remove(callback)
+
+    def take_job(self, timeout: float | None = None, stop_event: threading.Event | None = None) -> PrintJob | None:
+        """
+        Removes the highest priority job for a printer, blocking until one is available.
+        The job's status becomes "printing" until complete_job() is called for it.
+        Args:
+            timeout (float | None): Maximum seconds to wait; None waits indefinitely.
+            stop_event (threading.Event | None): When set (followed by wake_consumers()), the wait ends early.
+        Returns:
+            PrintJob | None: The job to print, or None on timeout or stop.
+        """
+        stopping = stop_event.is_set if stop_event is not None else lambda: False
+        with self.job_available:
+            self.job_available.wait_for(lambda: not self.is_empty() or stopping(), timeout)
+            if self.is_empty() or stopping():
                 return None
+            job = self._next_job()
+            self._remove_job(job, STATUS_PRINTING)
+            self._record_printed(job)
+            self.events.emit(INFO, "job_started", self.current_simulation_time, job=job, size=self.size,
+                             printer=threading.current_thread().name)
+        self.events.dispatch()
+        self._commit()
+        return job
+
+    def complete_job(self, job: PrintJob):
+        """
+        Marks a job taken with take_job() as printed.
+        """
+        with self.lock:
+            job.status = STATUS_COMPLETED
+            self.events.emit(INFO, "job_completed", self.current_simulation_time, job=job,
+                             printer=threading.current_thread().name)
+        self.events.dispatch()
 
-            
-            active_jobs.sort(key=lambda job: (job.priority, -job.waiting_time))
+    def wake_consumers(self):
+        """
+        Wakes every thread blocked in take_job() so it can re-check its stop event.
+        """
+        with self.job_available:
+            self.job_available.notify_all()
 
-            # The job to print is the first item in the sorted list.
-            job_to_print = active_jobs.pop(0) # Get and remove the highest priority job from the temporary list
+    def get_job(self, job_id: str) -> PrintJob | None:
+        """
+        Looks up a waiting job (queued or spilled) by its job ID in O(1).
+        Returns:
+            PrintJob | None: The job, or None if no waiting job has that ID.
+        """
+        with self.lock:
+            return self._find_job(job_id)
 
-            # Rebuild the circular queue with the remaining jobs after popping the active job.
-            self.queue = [None] * self.capacity # Reset the queue array
-            self.front = 0 # Reset front pointer
-            self.rear = 0 # Reset rear pointer
-            self.size = 0 # Reset size
+    def cancel_job(self, job_id: str) -> bool:
+        """
+        Removes a waiting job (queued or spilled) by its job ID, without rebuilding the queue.
+        Its status becomes "cancelled".
+        Returns:
+            bool: True if the job was cancelled, False if no waiting job has that ID.
+        """
+        with self.lock:
+            job = self._find_job(job_id)
+            if job is not None:
+                if job._cohort is None:
+                    del self._overflow[job]
+                self._cancel_job(job)
+        self.events.dispatch()
+        self._commit()
+        return job is not None
 
-            for job in active_jobs:
-                # Re-add each remaining job to the queue, preserving relative order.
-                self.queue[self.rear] = job
-                self.rear = (self.rear + 1) % self.capacity
-                self.size += 1
+    def cancel_user_jobs(self, user_id: str) -> int:
+        """
+        Removes every waiting job (queued or spilled) submitted by a user, in
+        O(k log n) for k jobs rather than a scan of the queue.
+        Returns:
+            int: The number of jobs cancelled.
+        """
+        with self.lock:
+            jobs = list(self._jobs_by_user.get(user_id, ()))
+            # Drop the user's spilled jobs first, so cancelling their queued jobs does not admit them.
+            for job in jobs:
+                if job._cohort is None:
+                    del self._overflow[job]
+            for job in jobs:
+                self._cancel_job(job)
+            if jobs:
+                self.events.emit(INFO, "user_jobs_cancelled", self.current_simulation_time, user_id=user_id,
+                                 count=len(jobs), size=self.size)
+        self.events.dispatch()
+        self._commit()
+        return len(jobs)
 
-            # Update the status of the printed job.
-            job_to_print.status = "completed"
-            print(f"[{self.current_simulation_time}s] INFO: Printing job: '{job_to_print.title}' "
-                  f"(ID: {job_to_print.job_id[:8]}..., Priority: {job_to_print.priority}, "
-                  f"Wait Time: {job_to_print.waiting_time:.1f}s). Current queue size: {self.size}.")
-            return job_to_print
+    def _cancel_job(self, job: PrintJob):
+        """
+        Cancels a queued job, or a spilled job already taken out of the overflow store.
+        Must be called while holding `self.lock`.
+        """
+        if job._cohort is not None:
+            self._remove_job(job, STATUS_CANCELLED)
+        else:
+            self._unindex_job(job)
+            job.status = STATUS_CANCELLED
+        self.metrics.jobs_cancelled += 1
+        self.events.emit(INFO, "job_cancelled", self.current_simulation_time, job=job, size=self.size)
 
 
     # ======================================================================
@@ -151,21 +1118,133 @@ class PrintQueueManager:
         """
         Increases the priority of jobs that have been waiting for a long time.
         """
-        print(f"[{self.current_simulation_time}s] INFO: Applying priority aging...")
-        with self.lock: # Ensure thread safety while iterating and modifying jobs
-            for i in range(self.size):
-                idx = (self.front + i) % self.capacity
-                job = self.queue[idx]
-                
-                # Ensure the job exists and is currently waiting before applying aging.
-                if job and job.status == "waiting":
-                    if job.waiting_time > 0 and int(job.waiting_time) % self.priority_aging_interval == 0:
-                        # Decrease priority (lower number = higher urgency), ensuring it doesn't go below 1.
-                        old_priority = job.priority
-                        job.priority = max(1, job.priority - 1)
-                        if job.priority < old_priority: # Only print if priority actually changed
-                            print(f"[{self.current_simulation_time}s] INFO: Job '{job.title}' (ID: {job.job_id[:8]}...) priority aged from {old_priority} to {job.priority}.")
-        print(f"[{self.current_simulation_time}s] INFO: Priority aging check complete.")
+        with self.lock: # Ensure thread safety while moving cohorts between levels
+            self._age_due_cohorts()
+        self.events.dispatch()
+        self._commit()
+
+    def reprioritize(self, job_id: str, priority: int) -> bool:
+        """
+        Changes the priority of a waiting job (queued or spilled) in O(log n). A queued
+        job moves to the aging cohort of its new level and keeps aging on the same schedule.
+        Args:
+            job_id (str): The job to change.
+            priority (int): The new priority (lower number = higher urgency).
+        Returns:
+            bool: True if the job was found, False if no waiting job has that ID.
+        Raises:
+            TypeError: If `priority` is not an integer.
+            ValueError: If a journal is attached and cannot record `priority`.
+        """
+        if not isinstance(priority, int) or isinstance(priority, bool):
+            raise TypeError("priority must be an integer")
+        with self.lock:
+            job = self._find_job(job_id)
+            if job is not None:
+                old_priority = job.priority
+                if job._cohort is None:
+                    job._priority = priority # Spilled: the priority applies once it joins the queue.
+                    if self._journal is not None:
+                        try:
+                            self._journal.enqueue_record(job) # It is journaled then, so it must encode.
+                        except ValueError:
+                            job._priority = old_priority
+                            raise
+                elif priority != old_priority:
+                    self._move_job(job, priority)
+                self.metrics.jobs_reprioritized += 1
+                self.events.emit(INFO, "job_reprioritized", self.current_simulation_time, job=job,
+                                 old_priority=old_priority, new_priority=priority)
+        self.events.dispatch()
+        self._commit()
+        return job is not None
+
+    def _move_job(self, job: PrintJob, priority: int):
+        """
+        Moves a queued job to the aging cohort for `priority` and its aging phase.
+        Must be called while holding `self.lock`.
+        Raises:
+            ValueError: If the journal cannot record the new priority; the job is not moved.
+        """
+        if self._journal is not None:
+            self._journal.log_reprioritize(job, priority) # Logged first, so a failure leaves the job in place.
+        self._detach_from_cohort(job)
+        cohort = self._cohort_for(priority, job.enqueued_at % self.priority_aging_interval)
+        cohort.push(job)
+        if cohort.peek() is job:
+            self._rekey_cohort(cohort)
+        self._record_change(CHANGE_MOVED, job, cohort, cohort.level)
+
+    def _age_due_cohorts(self):
+        """
+        Promotes, by one priority level, every cohort whose aging phase matches the
+        current simulation time: O(priority levels) per call, independent of the
+        number of waiting jobs. Aging is applied at most once per simulated second.
+        Must be called while holding `self.lock`.
+        """
+        self.events.emit(INFO, "aging_started", self.current_simulation_time)
+        now = self.current_simulation_time
+        if now != self._aged_at:
+            self._aged_at = now
+            self._promote_cohorts(now % self.priority_aging_interval, 1)
+            if self._journal is not None:
+                self._journal.log_age(now)
+        self.events.emit(INFO, "aging_complete", self.current_simulation_time)
+
+    def _age_until(self, target_time: int):
+        """
+        Moves the clock forward to `target_time`, applying in one step all the aging
+        that tick() would apply for every second in between. A cohort with phase p is
+        due once for each second t in (now, target_time] with t % aging_interval == p,
+        so each cohort is promoted once, by that count of levels.
+        Must be called while holding `self.lock`.
+        """
+        now = self.current_simulation_time
+        interval = self.priority_aging_interval
+        phases = {phase for cohorts in self._levels.values() for phase in cohorts if phase is not None}
+        for phase in sorted(phases):
+            steps = (target_time - phase) // interval - (now - phase) // interval
+            if steps > 0:
+                self._promote_cohorts(phase, steps, target_time)
+        self.current_simulation_time = target_time
+        self._aged_at = target_time
+        if self._journal is not None:
+            self._journal.log_age_until(target_time)
+
+    def _promote_cohorts(self, phase: int, steps: int, now: int | None = None):
+        """
+        Promotes every cohort of an aging phase by `steps` priority levels, stopping at 1.
+        Must be called while holding `self.lock`.
+        """
+        now = self.current_simulation_time if now is None else now
+        # Walk the levels from most to least urgent so that each promoted cohort
+        # lands on a slot the cohort below it has just vacated.
+        for level in sorted(self._levels):
+            cohorts = self._levels[level]
+            if level == 1 or phase not in cohorts:
+                continue
+            cohort = cohorts.pop(phase)
+            if not cohorts:
+                del self._levels[level]
+            # Decrease priority (lower number = higher urgency), ensuring it doesn't go below 1.
+            new_level = max(1, level - steps)
+            if new_level == 1:
+                # Merge into the shared priority-1 cohort; each job does this at most once.
+                floor = self._cohort_for(1, phase)
+                for job in cohort:
+                    floor.push(job)
+                self._cohort_heads.discard(cohort)
+                self._rekey_cohort(floor)
+                self._record_change(CHANGE_AGED, cohort, new_level, floor)
+            else:
+                cohort.level = new_level
+                self._levels.setdefault(new_level, {})[phase] = cohort
+                self._rekey_cohort(cohort)
+                self._record_change(CHANGE_AGED, cohort, new_level, None)
+            if new_level < level: # Only log if priority actually changed
+                self.metrics.jobs_aged += len(cohort) * (level - new_level)
+                self.events.emit(INFO, "job_aged", now, count=len(cohort), phase=phase,
+                                 old_priority=level, new_priority=new_level)
 
 
     # ======================================================================
@@ -174,48 +1253,43 @@ class PrintQueueManager:
     # Goal: Remove jobs that have waited too long.
     # ======================================================================
 
-    def remove_expired_jobs(self):
+    def remove_expired_jobs(self) -> int:
         """
         Checks for and removes jobs that have exceeded their configured expiry time.
+        Costs O(expired jobs) per call rather than a scan of the whole queue.
+        Returns:
+            int: The number of jobs that expired.
         """
-        print(f"[{self.current_simulation_time}s] INFO: Checking for expired jobs...")
         with self.lock: # Ensure thread safety during queue modification
-            jobs_to_keep = []
-            expired_jobs_count = 0
+            expired_jobs_count = self._expire_due_jobs()
+        self.events.dispatch()
+        self._commit()
+        return expired_jobs_count
 
-            # Iterate through all current jobs in the queue
-            for i in range(self.size):
-                idx = (self.front + i) % self.capacity
-                job = self.queue[idx]
-                
-                if job is None:
-                    continue
-
-                # Check if the job's waiting_time has exceeded the default expiry time
-                is_expired = job.waiting_time >= self.default_expiry_time_seconds
-                
-                if is_expired and job.status == "waiting": # Only expire jobs that are currently waiting
-                    self._notify_expiry(job)
-                    expired_jobs_count += 1
-                else:
-                    # If not expired (e.g., printing/completed), keep it.
-                    jobs_to_keep.append(job)
-            
-            # If any jobs were expired, rebuild the queue with only the jobs to keep.
-            if expired_jobs_count > 0:
-                self.queue = [None] * self.capacity # Reset the queue array
-                self.front = 0 # Reset front pointer
-                self.rear = 0 # Reset rear pointer
-                self.size = 0 # Reset size
-
-                for job in jobs_to_keep:
-                    # Re-add each non-expired job to the queue.
-                    self.queue[self.rear] = job
-                    self.rear = (self.rear + 1) % self.capacity
-                    self.size += 1
-                print(f"[{self.current_simulation_time}s] INFO: --- {expired_jobs_count} job(s) removed due to expiry. Current queue size: {self.size}. ---")
-            else:
-                print(f"[{self.current_simulation_time}s] INFO: No expired jobs to remove.")
+    def _expire_due_jobs(self):
+        """
+        Removes every job whose deadline has been reached and returns how many there were.
+        Must be called while holding `self.lock`.
+        """
+        self.events.emit(INFO, "expiry_started", self.current_simulation_time)
+        expired_jobs_count = 0
+
+        # The expiry index is ordered by deadline (enqueue time + the job's expiry time),
+        # so stop at the first job whose deadline has not been reached yet.
+        while self._expiry_index:
+            job = self._expiry_index.peek()
+            if job.waiting_time < job.expiry_time:
+                break
+            self._remove_job(job, STATUS_EXPIRED)
+            self._notify_expiry(job)
+            expired_jobs_count += 1
+
+        self.metrics.jobs_expired += expired_jobs_count
+        if expired_jobs_count > 0:
+            self.events.emit(INFO, "expiry_complete", self.current_simulation_time, count=expired_jobs_count, size=self.size)
+        else:
+            self.events.emit(INFO, "no_expired_jobs", self.current_simulation_time)
+        return expired_jobs_count
 
 
     def _notify_expiry(self, job: PrintJob):
@@ -224,8 +1298,7 @@ class PrintQueueManager:
         Args:
             job (PrintJob): The job object that has expired.
         """
-        job.status = "expired"
-        print(f"[{self.current_simulation_time}s] WARNING: [JOB EXPIRED] Job '{job.title}' (ID: {job.job_id[:8]}...) for user '{job.user_id}' has expired and been removed from the queue.")
+        self.events.emit(WARNING, "job_expired", self.current_simulation_time, job=job)
 
 
     # ======================================================================
@@ -234,9 +1307,80 @@ class PrintQueueManager:
     # Goal: Handle simultaneous job submissions safely.
     # ======================================================================
 
+    def enqueue_many(self, jobs_data: list[tuple]) -> list[bool]:
+        """
+        Adds a batch of print jobs under a single acquisition of the queue lock.
+        Each job_info tuple should be (user_id, title, priority) with an optional
+        fourth expiry_time element. Jobs are validated and built before the lock
+        is taken; invalid entries are rejected, and entries that do not fit are
+        handled by the overflow policy (the "block" policy's timeout covers the whole batch).
+        Args:
+            jobs_data (list[tuple]): The jobs to submit, in submission order.
+        Returns:
+            list[bool]: For each submitted job, True if it was accepted and False if it was rejected.
+        """
+        return self._enqueue(self._build_jobs(jobs_data), self._block_deadline(), "enqueue_many")
+
+    def _build_jobs(self, jobs_data: list[tuple]) -> list[PrintJob | None]:
+        """
+        Builds the jobs of a batch, logging each invalid entry and leaving None in its place.
+        """
+        new_jobs = []
+        for job_info in jobs_data:
+            try:
+                new_jobs.append(self._build_job(job_info))
+            except (TypeError, ValueError) as exc:
+                self.events.emit(ERROR, "job_invalid", self.current_simulation_time, job_info=job_info, reason=exc)
+                new_jobs.append(None)
+        return new_jobs
+
+    @staticmethod
+    def _build_job(job_info: tuple) -> PrintJob:
+        """
+        Validates a (user_id, title[, priority[, expiry_time]]) tuple and builds its PrintJob.
+        Raises:
+            TypeError, ValueError: If the tuple is malformed.
+        """
+        if not 2 <= len(job_info) <= 4:
+            raise ValueError("expected (user_id, title[, priority[, expiry_time]])")
+        user_id, title, *rest = job_info
+        priority = rest[0] if len(rest) > 0 else 5
+        expiry_time = rest[1] if len(rest) > 1 else None
+        if not isinstance(user_id, str) or not isinstance(title, str):
+            raise TypeError("user_id and title must be strings")
+        if not isinstance(priority, int) or isinstance(priority, bool):
+            raise TypeError("priority must be an integer")
+        if expiry_time is not None and (not isinstance(expiry_time, int) or expiry_time < 0):
+            raise ValueError("expiry_time must be a non-negative integer")
+        return PrintJob(user_id, title, priority, expiry_time)
+
+    def submit_job(self, user_id: str, title: str, priority: int = 5, expiry_time: int | None = None) -> concurrent.futures.Future:
+        """
+        Enqueues a job from the manager's long-lived submission executor, for callers
+        that need to hand submissions off to other threads. The executor is created
+        on first use and reused until shutdown() is called.
+        Returns:
+            concurrent.futures.Future: Resolves to the result of enqueue_job().
+        """
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self.submission_workers, thread_name_prefix="print-submit")
+            executor = self._executor
+        return executor.submit(self.enqueue_job, user_id, title, priority, expiry_time)
+
+    def shutdown(self, wait: bool = True):
+        """
+        Shuts down the submission executor, if one was started.
+        """
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
     def handle_simultaneous_submissions(self, jobs_data: list[tuple]) -> list[str]:
         """
-        Handles multiple job submissions concurrently using a ThreadPoolExecutor.
+        Handles multiple simultaneous job submissions as one batch via enqueue_many().
         Each job_info tuple should be (user_id, title, priority).
         Args:
             jobs_data (list[tuple]): A list of tuples, where each tuple contains
@@ -245,28 +1389,18 @@ class PrintQueueManager:
             list[str]: A list of outcome messages for each submission.
         """
         all_submissions_outcomes = []
-        print(f"\n[{self.current_simulation_time}s] INFO: --- Handling simultaneous job submissions ---")
-        # Use ThreadPoolExecutor to run enqueue_job calls concurrently.
-        # max_workers=5 allows up to 5 submission tasks to run in parallel.
-        with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
-            
-            future_to_job = {executor.submit(self.enqueue_job, user, title, prio): title for user, title, prio in jobs_data}
-            
-            # Iterate over futures as they complete to collect results or handle exceptions.
-            for future in concurrent.futures.as_completed(future_to_job):
-                job_title = future_to_job[future]
-                try:
-                    #result of the enqueue operation (True/False).
-                    result = future.result()
-                    if result:
-                        all_submissions_outcomes.append(f"Successfully processed concurrent submission for '{job_title}'.")
-                    else:
-                        all_submissions_outcomes.append(f"Failed to process concurrent submission for '{job_title}'.")
-                except Exception as exc:
-                    print(f"[{self.current_simulation_time}s] ERROR: Concurrent job submission for '{job_title}' raised an exception: {exc}")
-                    all_submissions_outcomes.append(f"Concurrent submission for '{job_title}' failed with exception: {exc}")
-
-        print(f"[{self.current_simulation_time}s] INFO: --- All concurrent job submissions processed. ---")
+        self.events.emit(INFO, "batch_started", self.current_simulation_time)
+        # The batch is inserted under one lock acquisition, so a thread per job would only add overhead.
+        results = self.enqueue_many(jobs_data)
+        for job_info, result in zip(jobs_data, results):
+            job_title = job_info[1] if isinstance(job_info, tuple) and len(job_info) > 1 else job_info
+            if result:
+                all_submissions_outcomes.append(f"Successfully processed concurrent submission for '{job_title}'.")
+            else:
+                all_submissions_outcomes.append(f"Failed to process concurrent submission for '{job_title}'.")
+
+        self.events.emit(INFO, "batch_complete", self.current_simulation_time)
+        self.events.dispatch()
         return all_submissions_outcomes
 
 
@@ -276,31 +1410,79 @@ class PrintQueueManager:
     # Goal: Simulate the passage of time and trigger time-based events.
     # ======================================================================
 
-    def tick(self):
+    def tick(self) -> int:
         """
         Simulates the passage of one unit of time.
-        This function updates the waiting time for all jobs, then triggers
-        priority aging and expired job cleanup processes.
+        Waiting times are derived from each job's enqueue time, so advancing
+        the clock is constant time; priority aging and expired job cleanup
+        then only touch the jobs whose thresholds are crossed on this tick.
+        Returns:
+            int: The number of jobs that expired on this tick.
         """
-        # Increment the simulated current time.
-        self.current_simulation_time += 1
-        print(f"\n[{self.current_simulation_time}s] INFO: TICK! Simulating 1 second passing.")
+        # Increment the simulated current time. Every queued job's waiting time advances with it.
+        # The clock, aging and expiry are updated under one lock acquisition so that no job
+        # can be enqueued between the clock moving and the aging step for that second.
+        started = time.perf_counter()
+        with self.lock:
+            self.current_simulation_time += 1
+            if self._journal is not None:
+                self._journal.log_clock(self.current_simulation_time)
+            self.events.emit(INFO, "tick", self.current_simulation_time)
+            self.events.emit(INFO, "waiting_advanced", self.current_simulation_time, size=self.size)
 
-        # Update waiting times for all jobs currently in the queue that are in 'waiting' status.
-        with self.lock: # Acquire lock before iterating and modifying job properties
-            for i in range(self.size):
-                idx = (self.front + i) % self.capacity
-                job = self.queue[idx]
-                if job and job.status == "waiting": # Only update waiting time for jobs that are still waiting
-                    job.waiting_time += 1
-                    print(f"[{self.current_simulation_time}s] INFO: Job '{job.title}' (ID: {job.job_id[:8]}...) waiting time updated to {job.waiting_time:.1f}s.")
+            # Trigger priority aging for jobs.
+            self._age_due_cohorts()
 
-        # Trigger priority aging for jobs.
-        self.apply_priority_aging()
+            # Trigger cleanup for expired jobs.
+            expired_jobs_count = self._expire_due_jobs()
+            self.events.emit(INFO, "tick_complete", self.current_simulation_time)
+            self.metrics.depth.append((self.current_simulation_time, self.size))
+            self.metrics.latency["tick"].observe(time.perf_counter() - started)
+        self.events.dispatch()
+        self._commit()
+        return expired_jobs_count
 
-        # Trigger cleanup for expired jobs.
-        self.remove_expired_jobs()
-        print(f"[{self.current_simulation_time}s] INFO: Tick processing complete.")
+    def advance(self, seconds: int) -> int:
+        """
+        Fast-forwards the simulation clock by `seconds` in one step. Jobs end up with
+        the same priorities, waiting times and expiries as after calling tick()
+        `seconds` times, but the cost depends on the number of distinct expiry
+        deadlines inside the window rather than on its length.
+        Args:
+            seconds (int): Number of simulated seconds to move forward.
+        Returns:
+            int: The number of jobs that expired during the window.
+        """
+        started = time.perf_counter()
+        with self.lock:
+            target_time = self.current_simulation_time + seconds
+            self.events.emit(INFO, "advance", self.current_simulation_time, seconds=seconds, target_time=target_time)
+            expired_jobs_count = 0
+            while self.current_simulation_time < target_time:
+                # Stop at the next expiry deadline inside the window, so expired jobs keep
+                # the priority and waiting time they had at the second they expired.
+                step_time = target_time
+                next_to_expire = self._expiry_index.peek()
+                if next_to_expire is not None:
+                    deadline = next_to_expire.enqueued_at + next_to_expire.expiry_time
+                    step_time = min(target_time, max(self.current_simulation_time + 1, deadline))
+                self._age_until(step_time)
+                expired_jobs_count += self._expire_due_jobs()
+            self.events.emit(INFO, "advance_complete", self.current_simulation_time, size=self.size)
+            self.metrics.depth.append((self.current_simulation_time, self.size))
+            self.metrics.latency["advance"].observe(time.perf_counter() - started)
+        self.events.dispatch()
+        self._commit()
+        return expired_jobs_count
+
+    def run_until(self, target_time: int) -> int:
+        """
+        Fast-forwards the simulation clock to `target_time` (see advance()).
+        Does nothing if the clock is already at or past it.
+        Returns:
+            int: The number of jobs that expired on the way.
+        """
+        return self.advance(max(0, target_time - self.current_simulation_time))
 
 
     # ======================================================================
@@ -315,66 +1497,173 @@ class PrintQueueManager:
         Jobs are displayed sorted by priority (lowest number first) and then
         by waiting time (longest waiting first, for tie-breaking).
         """
-        print(f"\n=== Print Queue Status (Time: {self.current_simulation_time}s) ===")
         with self.lock: # Acquire lock to get a consistent snapshot of the queue
-            if self.is_empty():
-                print("The queue is empty.")
-                print("="*80)
-                return
-            
-            # Collect jobs currently in the queue for display.
-            # Filter out any None values, though with correct size tracking, there shouldn't be any.
-            jobs_to_display = [self.queue[(self.front + i) % self.capacity] for i in range(self.size) if self.queue[(self.front + i) % self.capacity] is not None]
-
-            # Sort jobs for display based on priority and waiting time (same logic as `print_job`).
-            jobs_to_display.sort(key=lambda j: (j.priority, -j.waiting_time))
-
-            # Print table header
-            print(f"{'ID':<10} | {'User':<8} | {'Title':<20} | {'Prio':<5} | {'Wait (s)':<9} | {'Status':<10} | {'Expiry (s)':<11}")
-            print("-" * 100) # Adjusted separator length for new column
-
-            # Print each job's details
-            for job in jobs_to_display:
-                # Calculate remaining expiry time, showing 0 if already expired or if job is completed.
-                # This makes the expiry info more user-friendly.
-                remaining_expiry = self.default_expiry_time_seconds - job.waiting_time
-                expiry_info = f"{max(0, remaining_expiry):<10.1f}" if job.status == "waiting" else "N/A" # Only show expiry for waiting jobs
-                
-                print(f"{job.job_id[:8]:<10} | {job.user_id:<8} | {job.title:<20} | {job.priority:<5} | {job.waiting_time:<9.1f} | {job.status:<10} | {expiry_info}")
-            
-            print("-" * 100) # Adjusted separator length
-            print(f"Queue Size: {self.size}/{self.capacity}")
-            print("="*80)
+            current_time = self.current_simulation_time
+            queue_size = self.size
+            # Collect the displayed values of the jobs currently in the queue; the table is
+            # formatted and printed after the lock is released.
+            rows = [(job.job_id, job.user_id, job.title, job.priority, job.waiting_time, job.status, job.expiry_time)
+                    for job in self._iter_ring()]
+
+        self.events.flush() # Keep the table after any events logged before it.
+        print_status_table(current_time, rows, queue_size, self.capacity)
+
+    def get_metrics(self) -> dict:
+        """
+        Returns the queue's built-in metrics. Latencies are in seconds and include
+        the time spent waiting for the lock; job waiting times are in simulated seconds.
+        Returns:
+            dict: A dictionary with these keys:
+                - current_time: the simulation time.
+                - operations: a latency histogram summary (count, sum, mean, p50, p95, p99, max,
+                  bounds, buckets) for each of enqueue, enqueue_many, print, tick and advance.
+                - wait_time: a histogram summary of the waiting time of printed jobs.
+                - lock: wait and hold statistics of the queue lock.
+                - jobs: counts of enqueued, rejected (queue full), invalid, printed, aged
+                  (priority levels gained), expired, evicted, spilled, cancelled and reprioritized jobs.
+                - queue_depth: current, max, capacity, slots (allocated ring slots), overflow
+                  (jobs in the overflow store), and samples, the recent (simulation time, size)
+                  pairs recorded by tick() and advance().
+        """
+        with self.lock:
+            metrics = self.metrics
+            return {
+                'current_time': self.current_simulation_time,
+                'operations': {operation: histogram.summary() for operation, histogram in metrics.latency.items()},
+                'wait_time': metrics.wait_time.summary(),
+                'lock': self.lock.summary(),
+                'jobs': {
+                    'enqueued': metrics.jobs_enqueued,
+                    'rejected': metrics.jobs_rejected,
+                    'invalid': metrics.jobs_invalid,
+                    'printed': metrics.jobs_printed,
+                    'aged': metrics.jobs_aged,
+                    'expired': metrics.jobs_expired,
+                    'evicted': metrics.jobs_evicted,
+                    'spilled': metrics.jobs_spilled,
+                    'cancelled': metrics.jobs_cancelled,
+                    'reprioritized': metrics.jobs_reprioritized,
+                },
+                'queue_depth': {
+                    'current': self.size,
+                    'max': metrics.max_depth,
+                    'capacity': self.capacity,
+                    'slots': len(self.queue),
+                    'overflow': len(self._overflow),
+                    'samples': list(metrics.depth),
+                },
+            }
+
+    def get_metrics_text(self) -> str:
+        """
+        Returns get_metrics() in the Prometheus text exposition format, e.g. for a /metrics endpoint.
+        """
+        return format_prometheus(self.get_metrics())
+
+    def _sync_view(self) -> SnapshotView:
+        """
+        Brings the snapshot view up to date and returns it. The queue lock is only
+        held to swap out the pending change log, except on first use (or after the
+        log overflowed), when the view is rebuilt from the queued jobs.
+        Must be called while holding `self._view_lock`.
+        """
+        with self.lock:
+            if self._change_log is None:
+                jobs = [(job, job._cohort, job._cohort.level) for job in self._iter_ring()]
+                changes = None
+            else:
+                changes = self._change_log
+            self._change_log = []
+            state = (self._version, self.current_simulation_time, self.size)
+        if changes is None:
+            self._view.rebuild(jobs, *state)
+        else:
+            self._view.apply(changes, *state)
+        return self._view
 
     def get_queue_snapshot(self) -> dict:
         """
         Returns a dictionary representing the current state of the queue.
+        The snapshot is built from a view that is kept current by replaying the
+        changes made since the last snapshot, so the queue lock is held only
+        briefly and each job's record is rendered once rather than on every call.
         Returns:
-            dict: A dictionary containing the queue snapshot.
+            dict: A dictionary containing the queue snapshot. Its 'version' can be
+                passed to changes_since() to poll for changes from then on.
         """
-        snapshot = {
-           'current_time': self.current_simulation_time,
-           'queue_size': self.size,
-           'queue_capacity': self.capacity,
-           'jobs': []
-        }
+        with self._view_lock:
+            view = self._sync_view()
+            return {
+                'current_time': view.current_time,
+                'queue_size': view.queue_size,
+                'queue_capacity': self.capacity,
+                'version': view.version,
+                'jobs': [view.job_data(record) for record in view.records.values()],
+            }
 
-        with self.lock: # Acquire lock to get a consistent snapshot of the queue
-            # Iterate through active jobs to add their data to the snapshot
-            for i in range(self.size):
-                actual_index = (self.front + i) % self.capacity
-                job = self.queue[actual_index]
-                if job: # Defensive check, ensures we only process valid job objects
-                    # Create a dictionary representation of the job for the snapshot
-                    job_data = {
-                        'job_id': job.job_id,
-                        'user_id': job.user_id,
-                        'title': job.title,
-                        'priority': job.priority,
-                        'created_at': job.created_at.isoformat(), # ISO format for datetime for easy parsing
-                        'status': job.status,
-                        'waiting_time': job.waiting_time
-                    }
-                    snapshot['jobs'].append(job_data)
-
-        return snapshot
+    def changes_since(self, version: int) -> dict:
+        """
+        Returns only the jobs that changed after a snapshot or earlier delta, so a
+        poller's cost follows the churn in the queue rather than its size. Waiting
+        times grow with the clock and are not reported as modifications; a job's
+        waiting time is `current_time - enqueued_at`.
+        Args:
+            version (int): The 'version' of the caller's last snapshot or delta.
+        Returns:
+            dict: 'version', 'current_time', 'queue_size', 'full', 'added' (job data of
+                jobs enqueued), 'modified' (job data of jobs whose priority changed) and
+                'removed' (IDs of jobs printed or expired). If `version` is too old to
+                answer from the retained history, 'full' is True and 'added' lists every
+                queued job, replacing the caller's copy.
+        """
+        with self._view_lock:
+            view = self._sync_view()
+            changes = view.changes_since(version)
+            full = changes is None
+            if full:
+                changes = {'added': [view.job_data(record) for record in view.records.values()],
+                           'modified': [], 'removed': []}
+            return {
+                'version': view.version,
+                'current_time': view.current_time,
+                'queue_size': view.queue_size,
+                'full': full,
+                **changes,
+            }
+
+def print_status_table(current_time: int, rows: list[tuple], queue_size: int, capacity: int):
+    """
+    Prints the queue status table used by show_status().
+    Jobs are displayed sorted by priority (lowest number first) and then
+    by waiting time (longest waiting first, for tie-breaking).
+    Args:
+        current_time (int): The simulation time to show in the header.
+        rows (list[tuple]): One (job_id, user_id, title, priority, waiting_time, status, expiry_time) tuple per job.
+        queue_size (int): Number of jobs in the queue.
+        capacity (int): Maximum number of jobs the queue can hold.
+    """
+    print(f"\n=== Print Queue Status (Time: {current_time}s) ===")
+    if not rows:
+        print("The queue is empty.")
+        print("="*80)
+        return
+
+    # Sort jobs for display based on priority and waiting time (same logic as `print_job`).
+    rows = sorted(rows, key=lambda row: (row[3], -row[4]))
+
+    # Print table header
+    print(f"{'ID':<10} | {'User':<8} | {'Title':<20} | {'Prio':<5} | {'Wait (s)':<9} | {'Status':<10} | {'Expiry (s)':<11}")
+    print("-" * 100) # Adjusted separator length for new column
+
+    # Print each job's details
+    for job_id, user_id, title, priority, waiting_time, status, expiry_time in rows:
+        # Calculate remaining expiry time, showing 0 if already expired or if job is completed.
+        # This makes the expiry info more user-friendly.
+        remaining_expiry = expiry_time - waiting_time
+        expiry_info = f"{max(0, remaining_expiry):<10.1f}" if status == STATUS_WAITING else "N/A" # Only show expiry for waiting jobs
+        
+        print(f"{job_id[:8]:<10} | {user_id:<8} | {title:<20} | {priority:<5} | {waiting_time:<9.1f} | {status:<10} | {expiry_info}")
+    
+    print("-" * 100) # Adjusted separator length
+    print(f"Queue Size: {queue_size}/{capacity}")
+    print("="*80)
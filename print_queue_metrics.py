@@ -0,0 +1,219 @@
+import threading
+from bisect import bisect_left
+from collections import deque
+from time import perf_counter
+
+# Latency buckets in seconds: 1us doubling up to ~16.8s.
+LATENCY_BUCKETS = tuple(1e-6 * 2 ** k for k in range(25))
+# Waiting-time buckets in simulated seconds.
+WAIT_TIME_BUCKETS = (0, 1, 2, 5, 10, 15, 30, 60, 120, 300, 600, 1800, 3600, 7200, 86400)
+# Operations whose latency the PrintQueueManager records.
+OPERATIONS = ("enqueue", "enqueue_many", "print", "tick", "advance")
+
+
+class Histogram:
+    """
+    A fixed-bucket histogram in the style of a Prometheus histogram: observe()
+    is one bisect and a few additions, and quantiles are estimated from the
+    buckets, so its cost and size do not grow with the number of observations.
+    Not thread-safe by itself; the manager only updates it while holding its lock.
+    """
+    def __init__(self, bounds: tuple):
+        self.bounds = bounds # Upper bounds ("le") of the finite buckets, ascending.
+        self.counts = [0] * (len(bounds) + 1) # Per-bucket counts; the last bucket is +Inf.
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimates the q-quantile (0-1) by linear interpolation inside its bucket,
+        like Prometheus' histogram_quantile(). The estimate never exceeds the largest observation.
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        for index, bucket_count in enumerate(self.counts):
+            if bucket_count and cumulative + bucket_count >= rank:
+                if index == len(self.bounds):
+                    return self.max
+                lower = self.bounds[index - 1] if index else 0.0
+                upper = self.bounds[index]
+                return min(self.max, lower + (upper - lower) * (rank - cumulative) / bucket_count)
+            cumulative += bucket_count
+        return self.max
+
+    def summary(self) -> dict:
+        """
+        Returns:
+            dict: count, sum, mean, p50, p95, p99, max, and the raw bucket `bounds` and per-bucket `buckets` counts.
+        """
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'mean': self.sum / self.count if self.count else 0.0,
+            'p50': self.quantile(0.50),
+            'p95': self.quantile(0.95),
+            'p99': self.quantile(0.99),
+            'max': self.max,
+            'bounds': self.bounds,
+            'buckets': list(self.counts),
+        }
+
+
+class InstrumentedLock:
+    """
+    A drop-in replacement for threading.Lock that records how long threads wait
+    to acquire it and how long they hold it. An uncontended acquire costs one
+    clock read on each side. The statistics are updated while the lock is held,
+    so they need no lock of their own. It can back a threading.Condition: waiting
+    on the condition releases and re-acquires through this lock, so time spent
+    waiting for a notification is not counted as holding or waiting for the lock.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._acquired_at = 0.0
+        self.acquisitions = 0
+        self.contended = 0 # Acquisitions that found the lock taken and had to wait.
+        self.wait_seconds = 0.0 # Total time spent waiting to acquire.
+        self.hold_seconds = 0.0 # Total time the lock was held.
+        self.max_wait_seconds = 0.0
+        self.max_hold_seconds = 0.0
+
+    def acquire(self, blocking: bool = True, timeout: float = -1) -> bool:
+        if not self._lock.acquire(False):
+            if not blocking:
+                return False
+            started = perf_counter()
+            if not self._lock.acquire(True, timeout):
+                return False
+            waited = perf_counter() - started
+            self.contended += 1
+            self.wait_seconds += waited
+            if waited > self.max_wait_seconds:
+                self.max_wait_seconds = waited
+        self.acquisitions += 1
+        self._acquired_at = perf_counter()
+        return True
+
+    __enter__ = acquire
+
+    def release(self):
+        held = perf_counter() - self._acquired_at
+        self.hold_seconds += held
+        if held > self.max_hold_seconds:
+            self.max_hold_seconds = held
+        self._lock.release()
+
+    def __exit__(self, exc_type, exc, tb):
+        held = perf_counter() - self._acquired_at # release(), inlined: this runs on every `with` block.
+        self.hold_seconds += held
+        if held > self.max_hold_seconds:
+            self.max_hold_seconds = held
+        self._lock.release()
+
+    def locked(self) -> bool:
+        return self._lock.locked()
+
+    def summary(self) -> dict:
+        """
+        Returns:
+            dict: acquisitions, contended, wait_seconds, hold_seconds, max_wait_seconds and max_hold_seconds.
+        """
+        return {
+            'acquisitions': self.acquisitions,
+            'contended': self.contended,
+            'wait_seconds': self.wait_seconds,
+            'hold_seconds': self.hold_seconds,
+            'max_wait_seconds': self.max_wait_seconds,
+            'max_hold_seconds': self.max_hold_seconds,
+        }
+
+
+class QueueMetrics:
+    """
+    Counters, histograms and queue-depth samples for one PrintQueueManager.
+    The manager updates them while holding its lock.
+    """
+    def __init__(self, depth_samples: int = 3600):
+        """
+        Args:
+            depth_samples (int): Number of most recent (simulation time, queue depth) samples kept.
+        """
+        self.latency = {operation: Histogram(LATENCY_BUCKETS) for operation in OPERATIONS} # Seconds per call.
+        self.wait_time = Histogram(WAIT_TIME_BUCKETS) # Simulated seconds waited by printed jobs.
+        self.depth = deque(maxlen=depth_samples) # (simulation time, queue size), sampled on every tick/advance.
+        self.max_depth = 0 # Largest queue size seen.
+        self.jobs_enqueued = 0
+        self.jobs_rejected = 0 # Rejected because the queue was full.
+        self.jobs_invalid = 0 # Rejected by enqueue_many() validation.
+        self.jobs_printed = 0 # Printed by print_job() or taken by take_job().
+        self.jobs_aged = 0 # Priority levels gained through aging, summed over jobs.
+        self.jobs_expired = 0
+        self.jobs_evicted = 0 # Removed by an eviction overflow policy.
+        self.jobs_spilled = 0 # Held in the overflow store because the queue was full.
+        self.jobs_cancelled = 0
+        self.jobs_reprioritized = 0
+
+
+def format_prometheus(metrics: dict, prefix: str = "print_queue") -> str:
+    """
+    Renders the dictionary returned by PrintQueueManager.get_metrics() in the
+    Prometheus text exposition format.
+    Args:
+        metrics (dict): The metrics to render.
+        prefix (str): Prefix of every metric name.
+    Returns:
+        str: The exposition text, ending with a newline.
+    """
+    lines = []
+
+    def metric(name, kind, help_text, samples):
+        lines.append(f"# HELP {prefix}_{name} {help_text}")
+        lines.append(f"# TYPE {prefix}_{name} {kind}")
+        for suffix, labels, value in samples:
+            label_text = "{" + ",".join(f'{key}="{label}"' for key, label in labels) + "}" if labels else ""
+            lines.append(f"{prefix}_{name}{suffix}{label_text} {value}")
+
+    def histogram_samples(histogram, labels=()):
+        samples = []
+        cumulative = 0
+        for bound, bucket_count in zip(histogram['bounds'] + ("+Inf",), histogram['buckets']):
+            cumulative += bucket_count
+            samples.append(("_bucket", labels + (("le", bound),), cumulative))
+        samples.append(("_sum", labels, histogram['sum']))
+        samples.append(("_count", labels, histogram['count']))
+        return samples
+
+    jobs = metrics['jobs']
+    metric("jobs_total", "counter", "Jobs by queue event; \"aged\" counts priority levels gained.",
+           [("", (("event", event),), jobs[event]) for event in jobs])
+    metric("queue_depth", "gauge", "Jobs currently waiting.", [("", (), metrics['queue_depth']['current'])])
+    metric("queue_depth_max", "gauge", "Largest number of jobs queued at once.",
+           [("", (), metrics['queue_depth']['max'])])
+    metric("queue_capacity", "gauge", "Maximum number of jobs the queue can hold.",
+           [("", (), metrics['queue_depth']['capacity'])])
+    metric("overflow_depth", "gauge", "Jobs waiting in the overflow store for room in the queue.",
+           [("", (), metrics['queue_depth']['overflow'])])
+    metric("simulation_time_seconds", "gauge", "Current simulation time.", [("", (), metrics['current_time'])])
+    metric("operation_latency_seconds", "histogram", "Time spent in queue operations, including lock wait.",
+           [sample for operation, histogram in metrics['operations'].items()
+            for sample in histogram_samples(histogram, (("operation", operation),))])
+    metric("job_wait_seconds", "histogram", "Simulated time printed jobs spent waiting.",
+           histogram_samples(metrics['wait_time']))
+    lock = metrics['lock']
+    metric("lock_acquisitions_total", "counter", "Acquisitions of the queue lock.", [("", (), lock['acquisitions'])])
+    metric("lock_contended_total", "counter", "Acquisitions of the queue lock that had to wait.",
+           [("", (), lock['contended'])])
+    metric("lock_wait_seconds_total", "counter", "Time spent waiting for the queue lock.",
+           [("", (), lock['wait_seconds'])])
+    metric("lock_hold_seconds_total", "counter", "Time the queue lock was held.", [("", (), lock['hold_seconds'])])
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,155 @@
+from collections import deque
+
+# Kinds of entries in a PrintQueueManager change log.
+CHANGE_ADDED = "added" # (version, CHANGE_ADDED, job, cohort, level): a job entered the queue.
+CHANGE_REMOVED = "removed" # (version, CHANGE_REMOVED, job): a job was printed, taken or expired.
+CHANGE_AGED = "aged" # (version, CHANGE_AGED, cohort, new_level, merged_into): a cohort changed priority.
+CHANGE_MOVED = "moved" # (version, CHANGE_MOVED, job, cohort, level): a job was reprioritized into another cohort.
+
+
+class SnapshotView:
+    """
+    A replica of the jobs in a PrintQueueManager, kept up to date by replaying
+    the manager's change log outside the queue lock.
+
+    The manager only appends small tuples to its change log while holding its
+    lock. Readers swap the pending log out in O(1) and replay it here, so the
+    cost of keeping the view current is proportional to the number of changes,
+    not to the queue size, and readers hold the queue lock only for the swap
+    (plus one pass over the queue when the view is first built). Each job's display record (with its rendered job ID and
+    creation time) is built once, when the job is added, and replaced, never
+    mutated, when its priority changes; published records are therefore never
+    modified after a reader has seen them.
+
+    Not thread-safe by itself; the manager serialises access with its view lock.
+    """
+    def __init__(self, history_limit: int = 100_000):
+        """
+        Args:
+            history_limit (int): Number of recent changes kept for changes_since().
+        """
+        self.version = 0 # Change log version the view reflects.
+        self.current_time = 0 # Simulation time at that version.
+        self.queue_size = 0
+        self.records = {} # job -> display record, in enqueue order.
+        self._cohort_of = {} # job -> the aging cohort it belongs to.
+        self._members = {} # cohort -> {job: None}, the jobs of each cohort in enqueue order.
+        self._history = deque(maxlen=history_limit) # (version, kind, jobs) per change, oldest first.
+        self._since = 0 # Oldest version changes_since() can answer from the history.
+
+    @staticmethod
+    def _build_record(job, level: int) -> dict:
+        return {
+            'job_id': job.job_id,
+            'user_id': job.user_id,
+            'title': job.title,
+            'priority': level,
+            'created_at': job.created_at.isoformat(), # ISO format for datetime for easy parsing
+            'status': job.status,
+            'enqueued_at': job.enqueued_at,
+            'expiry_time': job.expiry_time,
+        }
+
+    def rebuild(self, jobs: list[tuple], version: int, current_time: int, queue_size: int):
+        """
+        Replaces the view's contents with `jobs`, a list of (job, cohort, level)
+        triples for every queued job at `version`. Earlier history is discarded.
+        """
+        self.records = {}
+        self._cohort_of = {}
+        self._members = {}
+        self._history.clear()
+        for job, cohort, level in jobs:
+            self._add(job, cohort, level)
+        self._since = version
+        self._set_state(version, current_time, queue_size)
+
+    def apply(self, changes: list[tuple], version: int, current_time: int, queue_size: int):
+        """
+        Replays change log entries, oldest first, and moves the view to `version`.
+        """
+        history = self._history
+        for change in changes:
+            kind = change[1]
+            if kind == CHANGE_ADDED:
+                _, _, job, cohort, level = change
+                self._add(job, cohort, level)
+                history.append((change[0], CHANGE_ADDED, (job,)))
+            elif kind == CHANGE_REMOVED:
+                job = change[2]
+                if self.records.pop(job, None) is not None:
+                    self._leave_cohort(job)
+                history.append((change[0], CHANGE_REMOVED, (job,)))
+            elif kind == CHANGE_MOVED:
+                _, _, job, cohort, level = change
+                self._leave_cohort(job)
+                self.records[job] = {**self.records[job], 'priority': level}
+                self._cohort_of[job] = cohort
+                self._members.setdefault(cohort, {})[job] = None
+                history.append((change[0], CHANGE_MOVED, (job,)))
+            else:
+                _, _, cohort, new_level, merged_into = change
+                members = self._members.pop(cohort, {})
+                records = self.records
+                for job in members:
+                    record = records[job]
+                    records[job] = {**record, 'priority': new_level}
+                if merged_into is not None:
+                    self._members.setdefault(merged_into, {}).update(members)
+                    for job in members:
+                        self._cohort_of[job] = merged_into
+                elif members:
+                    self._members[cohort] = members
+                history.append((change[0], CHANGE_AGED, tuple(members)))
+        if len(history) == history.maxlen:
+            # Older changes have been dropped; changes_since() can only answer from here on.
+            self._since = max(self._since, history[0][0] - 1)
+        self._set_state(version, current_time, queue_size)
+
+    def _add(self, job, cohort, level: int):
+        self.records[job] = self._build_record(job, level)
+        self._cohort_of[job] = cohort
+        self._members.setdefault(cohort, {})[job] = None
+
+    def _leave_cohort(self, job):
+        cohort = self._cohort_of.pop(job)
+        members = self._members[cohort]
+        del members[job]
+        if not members:
+            del self._members[cohort]
+
+    def _set_state(self, version: int, current_time: int, queue_size: int):
+        self.version = version
+        self.current_time = current_time
+        self.queue_size = queue_size
+
+    def job_data(self, record: dict) -> dict:
+        """
+        Returns a job's snapshot dictionary: its record plus its waiting time at the view's time.
+        """
+        return {**record, 'waiting_time': float(self.current_time - record['enqueued_at'])}
+
+    def changes_since(self, version: int) -> dict | None:
+        """
+        Collects the jobs added, removed or modified after `version`.
+        Returns:
+            dict | None: {'added': [...], 'modified': [...], 'removed': [job IDs]}, or None
+                if `version` is older than the retained history (or newer than the view).
+        """
+        if version < self._since or version > self.version:
+            return None
+        added, touched, removed = {}, {}, {}
+        for change_version, kind, jobs in reversed(self._history):
+            if change_version <= version:
+                break
+            target = added if kind == CHANGE_ADDED else removed if kind == CHANGE_REMOVED else touched
+            for job in jobs:
+                target[job] = None
+        records = self.records
+        return {
+            # A job that was added and removed again since `version` was never seen by the caller.
+            'added': [self.job_data(records[job]) for job in reversed(added) if job in records],
+            'modified': [self.job_data(records[job]) for job in touched
+                         if job in records and job not in added],
+            'removed': [job.job_id for job in removed if job not in added],
+        }
@@ -0,0 +1,130 @@
+import threading
+import time
+from print_queue_manager import PrintQueueManager, PrintJob
+
+
+class Printer(threading.Thread):
+    """
+    A printer worker thread that repeatedly takes the highest priority job from a
+    PrintQueueManager, blocking while the queue is empty, and "prints" it for a
+    simulated duration. It keeps its own throughput and utilization counters.
+    """
+    def __init__(self, name: str, manager: PrintQueueManager, print_duration, stop_event: threading.Event,
+                 poll_timeout: float = 1.0):
+        super().__init__(name=name, daemon=True)
+        self.manager = manager # The queue this printer pulls jobs from.
+        self.print_duration = print_duration # Callable returning the seconds needed to print a job.
+        self.stop_event = stop_event # Set by the pool to ask the printer to finish.
+        self.poll_timeout = poll_timeout # Longest single wait for a job before re-checking the stop event.
+
+        # --- Printer Statistics ---
+        self.jobs_printed = 0 # Number of jobs this printer has completed.
+        self.busy_time = 0.0 # Wall-clock seconds spent printing.
+        self.started_at = None # time.monotonic() when the printer started.
+        self.stopped_at = None # time.monotonic() when the printer stopped.
+        self.current_job = None # The job being printed right now, if any.
+
+    def run(self):
+        self.started_at = time.monotonic()
+        while not self.stop_event.is_set():
+            job = self.manager.take_job(timeout=self.poll_timeout, stop_event=self.stop_event)
+            if job is None:
+                continue
+            self._print(job)
+        self.stopped_at = time.monotonic()
+
+    def _print(self, job: PrintJob):
+        """
+        Simulates printing a job, then reports it as completed to the manager.
+        """
+        self.current_job = job
+        start = time.monotonic()
+        time.sleep(self.print_duration(job))
+        self.busy_time += time.monotonic() - start
+        self.manager.complete_job(job)
+        self.jobs_printed += 1
+        self.current_job = None
+
+    def report(self) -> dict:
+        """
+        Returns this printer's statistics.
+        Returns:
+            dict: name, jobs_printed, busy_time, elapsed, throughput (jobs per second) and utilization (0-1).
+        """
+        if self.started_at is None:
+            elapsed = 0.0
+        else:
+            elapsed = (self.stopped_at or time.monotonic()) - self.started_at
+        return {
+            'name': self.name,
+            'jobs_printed': self.jobs_printed,
+            'busy_time': self.busy_time,
+            'elapsed': elapsed,
+            'throughput': self.jobs_printed / elapsed if elapsed else 0.0,
+            'utilization': min(1.0, self.busy_time / elapsed) if elapsed else 0.0,
+        }
+
+
+class PrinterPool:
+    """
+    Runs several Printer threads that consume from one shared PrintQueueManager.
+    Can be used as a context manager: printers start on entry and stop on exit.
+    """
+    def __init__(self, manager: PrintQueueManager, printers: int = 2, print_duration=0.5, poll_timeout: float = 1.0):
+        """
+        Args:
+            manager (PrintQueueManager): The queue to print from.
+            printers (int): Number of printer threads.
+            print_duration (float | Callable[[PrintJob], float]): Seconds to print each job,
+                either fixed or computed per job.
+            poll_timeout (float): Longest single wait for a job before a printer re-checks for shutdown.
+        """
+        self.manager = manager
+        self._stop_event = threading.Event()
+        duration = print_duration if callable(print_duration) else (lambda job: print_duration)
+        self.printers = [Printer(f"Printer-{i + 1}", manager, duration, self._stop_event, poll_timeout)
+                         for i in range(printers)]
+
+    def start(self):
+        """
+        Starts every printer thread.
+        """
+        for printer in self.printers:
+            printer.start()
+
+    def stop(self, wait: bool = True):
+        """
+        Asks every printer to stop after its current job and wakes any that are idle.
+        Args:
+            wait (bool): Whether to wait for the printer threads to finish.
+        """
+        self._stop_event.set()
+        self.manager.wake_consumers()
+        if wait:
+            for printer in self.printers:
+                printer.join()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def report(self) -> list[dict]:
+        """
+        Returns the statistics of every printer (see Printer.report()).
+        """
+        return [printer.report() for printer in self.printers]
+
+    def show_report(self):
+        """
+        Prints a formatted table of per-printer throughput and utilization.
+        """
+        print("\n=== Printer Report ===")
+        print(f"{'Printer':<12} | {'Jobs':<6} | {'Busy (s)':<9} | {'Jobs/s':<8} | {'Utilization':<11}")
+        print("-" * 60)
+        for stats in self.report():
+            print(f"{stats['name']:<12} | {stats['jobs_printed']:<6} | {stats['busy_time']:<9.2f} | "
+                  f"{stats['throughput']:<8.2f} | {stats['utilization']:<11.1%}")
+        print("=" * 60)
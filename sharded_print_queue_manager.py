@@ -0,0 +1,325 @@
+import itertools
+import threading
+import zlib
+from multiprocessing.managers import SyncManager, Value
+from print_queue_events import EventLog, INFO, ERROR
+from print_queue_manager import PrintQueueManager, PrintJob, print_status_table, _reseed_job_id_node
+
+
+def shard_by_user(user_id: str, title: str, priority: int) -> str:
+    """
+    Default shard key: every job of a user lands on the same shard.
+    """
+    return user_id
+
+
+class _SharedSequence:
+    """
+    The enqueue sequence shared by every shard, so that jobs on different shards
+    can be ordered by when they were enqueued. In process mode it lives in the
+    first shard server and the others reach it through a proxy.
+    """
+    def __init__(self):
+        self._counter = itertools.count()
+        self._lock = threading.Lock() # The server handles each client connection in its own thread.
+
+    def __next__(self) -> int:
+        with self._lock:
+            return next(self._counter)
+
+
+def _make_shard(capacity: int, expiry_time: int, aging_interval: int, event_level: int,
+                sequence) -> PrintQueueManager:
+    """
+    Builds one shard inside a shard server process.
+    """
+    _reseed_job_id_node() # Each server is forked from the same parent; give its job IDs their own node.
+    shard = PrintQueueManager(capacity, expiry_time, aging_interval, event_log=EventLog(level=event_level))
+    shard._enqueue_seq = sequence
+    return shard
+
+
+class _ShardEventLog:
+    """
+    The event log of an in-process shard: events go to the log shared by all
+    shards, with each "size" field replaced by the number of jobs across all of
+    them, since every shard reports sizes against the global capacity.
+    """
+    def __init__(self, events: EventLog, sharded: "ShardedPrintQueueManager"):
+        self._events = events
+        self._sharded = sharded
+
+    def emit(self, level: int, event: str, sim_time: int, **fields):
+        if level < self._events.level:
+            return
+        if 'size' in fields:
+            fields['size'] = self._sharded.size
+        self._events.emit(level, event, sim_time, **fields)
+
+    def __getattr__(self, name):
+        return getattr(self._events, name)
+
+
+class _ShardServer(SyncManager):
+    """
+    A server process hosting one PrintQueueManager shard. Proxies to the shard can
+    be pickled and used from any process that can reach the server.
+    """
+
+
+_ShardServer.register("Shard", _make_shard, exposed=(
+    "enqueue_job", "enqueue_many", "print_job", "print_job_if_next", "peek_next", "tick", "advance", "remove_expired_jobs",
+    "get_queue_snapshot", "__len__"))
+_ShardServer.register("Sequence", _SharedSequence, exposed=("__next__",))
+
+
+class ShardedPrintQueueManager:
+    """
+    A print queue partitioned into independent PrintQueueManager shards, each with
+    its own lock, so producers and consumers working on different shards do not
+    contend with each other and ticking one shard does not block submissions to
+    the others. Jobs are routed to a shard by a stable hash of `shard_key` (the
+    user by default).
+
+    All shards share one clock and the same expiry and aging settings, and a
+    global slot semaphore enforces `capacity` across all of them, so capacity,
+    aging and expiry behave as in a single PrintQueueManager. Jobs must be
+    consumed through this class (not through a shard directly) so that slots are
+    returned.
+
+    With processes=True every shard runs in its own server process; the sharded
+    manager can then be pickled and driven from other processes (e.g. the
+    workers of a ProcessPoolExecutor).
+
+    In-process shards log to one shared event log and report queue sizes across
+    all shards. In process mode each shard server logs its own events, so the
+    sizes it reports are its own shard's.
+    """
+    def __init__(self, num_shards: int = 4, capacity: int = 10, expiry_time: int = 300, aging_interval: int = 5,
+                 shard_key=shard_by_user, event_log: EventLog | None = None, processes: bool = False,
+                 event_level: int = INFO):
+        """
+        Args:
+            num_shards (int): Number of independent sub-queues.
+            capacity (int): Maximum number of jobs across all shards.
+            expiry_time (int): Default time in seconds for job expiry.
+            aging_interval (int): Interval in seconds at which job priorities are aged.
+            shard_key (Callable[[str, str, int], object]): Maps (user_id, title, priority) to the
+                value that is hashed to pick a shard. Must be picklable when processes=True.
+            event_log (EventLog | None): Event log shared by the in-process shards.
+            processes (bool): Host each shard in its own server process.
+            event_level (int): Event log level used inside shard server processes, and by
+                unpickled copies of this manager.
+        Raises:
+            ValueError: If `capacity` is less than 1.
+        """
+        if capacity < 1:
+            raise ValueError(f"capacity must be at least 1, got {capacity!r}") # Checked before starting any servers.
+        self.num_shards = num_shards
+        self.event_level = event_level
+        self.capacity = capacity
+        self.default_expiry_time_seconds = expiry_time
+        self.priority_aging_interval = aging_interval
+        self.shard_key = shard_key
+        self.processes = processes
+        self._servers = [] # Shard server processes owned by this instance (process mode only).
+
+        if processes:
+            self.events = EventLog(level=event_level)
+            for _ in range(num_shards):
+                server = _ShardServer()
+                server.start()
+                self._servers.append(server)
+            sequence = self._servers[0].Sequence()
+            self.shards = [server.Shard(capacity, expiry_time, aging_interval, event_level, sequence)
+                           for server in self._servers]
+            self._slots = self._servers[0].BoundedSemaphore(capacity) # Free queue slots across all shards.
+            self._clock_lock = self._servers[0].Lock() # Serializes ticks so the shard clocks stay in step.
+            self._clock = self._servers[0].Value('i', 0) # The shared simulation time, visible to every process.
+        else:
+            self.events = event_log if event_log is not None else EventLog()
+            # Each shard may hold the full capacity; the slot semaphore keeps the total within it.
+            shard_events = _ShardEventLog(self.events, self)
+            self.shards = [PrintQueueManager(capacity, expiry_time, aging_interval, event_log=shard_events)
+                           for _ in range(num_shards)]
+            sequence = itertools.count() # next() on a count is atomic, so the shards can share it directly.
+            for shard in self.shards:
+                shard._enqueue_seq = sequence
+            self._slots = threading.BoundedSemaphore(capacity) # Free queue slots across all shards.
+            self._clock_lock = threading.Lock() # Serializes ticks so the shard clocks stay in step.
+            self._clock = Value('i', 0) # The shared simulation time.
+
+    def __getstate__(self):
+        if not self.processes:
+            raise TypeError("only a ShardedPrintQueueManager created with processes=True can be pickled")
+        state = self.__dict__.copy()
+        state['_servers'] = [] # The server processes stay owned by the original instance.
+        state['events'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.events = EventLog(level=self.event_level)
+
+    def close(self):
+        """
+        Shuts down the shard server processes started by this instance (process mode only).
+        """
+        for server in self._servers:
+            server.shutdown()
+        self._servers = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    @property
+    def current_simulation_time(self) -> int:
+        """
+        The current simulated time in seconds, shared by every shard.
+        """
+        return self._clock.value
+
+    @property
+    def size(self) -> int:
+        """
+        Current number of jobs across all shards.
+        """
+        return sum(len(shard) for shard in self.shards)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _shard_index(self, user_id: str, title: str, priority: int) -> int:
+        # crc32 rather than hash(): str hashes are salted per process, and shard choice must agree across processes.
+        key = str(self.shard_key(user_id, title, priority)).encode()
+        return zlib.crc32(key) % self.num_shards
+
+    def enqueue_job(self, user_id: str, title: str, priority: int = 5, expiry_time: int | None = None) -> bool:
+        """
+        Adds a new print job to its shard. Only that shard's lock is taken.
+        Returns:
+            bool: True if the job was successfully enqueued, False if the queue is full.
+        """
+        if not self._slots.acquire(blocking=False):
+            self.events.emit(ERROR, "job_rejected", self.current_simulation_time, title=title)
+            self.events.dispatch()
+            return False
+        shard = self.shards[self._shard_index(user_id, title, priority)]
+        accepted = shard.enqueue_job(user_id, title, priority, expiry_time)
+        if not accepted:
+            self._slots.release()
+        return accepted
+
+    def enqueue_many(self, jobs_data: list[tuple]) -> list[bool]:
+        """
+        Adds a batch of print jobs, submitting one enqueue_many() batch per shard.
+        Returns:
+            list[bool]: For each submitted job, True if it was enqueued and False if it was rejected.
+        """
+        results = [False] * len(jobs_data)
+        batches = {} # shard index -> [(position in jobs_data, job_info)]
+        for position, job_info in enumerate(jobs_data):
+            if not self._slots.acquire(blocking=False):
+                title = job_info[1] if isinstance(job_info, tuple) and len(job_info) > 1 else job_info
+                self.events.emit(ERROR, "job_rejected", self.current_simulation_time, title=title)
+                continue
+            try:
+                user_id, title, *rest = job_info
+                index = self._shard_index(user_id, title, rest[0] if rest else 5)
+            except (TypeError, ValueError):
+                index = 0 # Let the shard reject it with its usual validation message.
+            batches.setdefault(index, []).append((position, job_info))
+        self.events.dispatch()
+
+        for index, batch in batches.items():
+            shard_results = self.shards[index].enqueue_many([job_info for _, job_info in batch])
+            for (position, _), accepted in zip(batch, shard_results):
+                results[position] = accepted
+                if not accepted:
+                    self._slots.release()
+        return results
+
+    def print_job(self) -> PrintJob | None:
+        """
+        Prints the highest priority job across all shards. Each shard is asked for
+        its head's ordering key, and the shard with the best head prints that job
+        if it is still its head; if another consumer changed the shard in between,
+        the shards are compared again.
+        Returns:
+            PrintJob | None: The printed job, or None if every shard is empty.
+        """
+        while True:
+            heads = [(key, index) for index, key in enumerate(shard.peek_next() for shard in self.shards)
+                     if key is not None]
+            if not heads:
+                self.events.emit(INFO, "queue_empty", self.current_simulation_time)
+                self.events.dispatch()
+                return None
+            key, index = min(heads)
+            job = self.shards[index].print_job_if_next(key)
+            if job is not None:
+                self._slots.release()
+                return job
+            # Another consumer took or changed that shard's head first; look again.
+
+    def tick(self) -> int:
+        """
+        Simulates one second passing on every shard.
+        Returns:
+            int: The number of jobs that expired across all shards.
+        """
+        with self._clock_lock:
+            expired_jobs_count = 0
+            for shard in self.shards:
+                expired_jobs_count += shard.tick()
+            self._clock.value += 1
+        for _ in range(expired_jobs_count):
+            self._slots.release()
+        return expired_jobs_count
+
+    def advance(self, seconds: int) -> int:
+        """
+        Fast-forwards every shard's clock by `seconds` (see PrintQueueManager.advance()).
+        Returns:
+            int: The number of jobs that expired across all shards.
+        """
+        with self._clock_lock:
+            expired_jobs_count = 0
+            for shard in self.shards:
+                expired_jobs_count += shard.advance(seconds)
+            self._clock.value += seconds
+        for _ in range(expired_jobs_count):
+            self._slots.release()
+        return expired_jobs_count
+
+    def run_until(self, target_time: int) -> int:
+        """
+        Fast-forwards every shard's clock to `target_time` (see PrintQueueManager.run_until()).
+        """
+        return self.advance(max(0, target_time - self.current_simulation_time))
+
+    def get_queue_snapshot(self) -> dict:
+        """
+        Returns a dictionary representing the current state of all shards, in the
+        same format as PrintQueueManager.get_queue_snapshot().
+        """
+        snapshots = [shard.get_queue_snapshot() for shard in self.shards]
+        return {
+            'current_time': self.current_simulation_time,
+            'queue_size': sum(snapshot['queue_size'] for snapshot in snapshots),
+            'queue_capacity': self.capacity,
+            'jobs': [job_data for snapshot in snapshots for job_data in snapshot['jobs']],
+        }
+
+    def show_status(self):
+        """
+        Prints a formatted, user-friendly snapshot of the jobs in every shard.
+        """
+        snapshot = self.get_queue_snapshot()
+        rows = [(job['job_id'], job['user_id'], job['title'], job['priority'], job['waiting_time'], job['status'],
+                 job['expiry_time']) for job in snapshot['jobs']]
+        self.events.flush()
+        print_status_table(snapshot['current_time'], rows, snapshot['queue_size'], self.capacity)
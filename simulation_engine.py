@@ -0,0 +1,368 @@
+import csv
+import heapq
+import itertools
+import json
+import time
+from typing import NamedTuple
+from print_queue_events import INFO
+from print_queue_manager import PrintQueueManager, PrintJob
+
+
+class TraceEvent(NamedTuple):
+    """
+    One timestamped event of a simulation trace.
+    """
+    time: int # Simulation time (seconds) at which the event happens.
+    event: str # Event type, e.g. "enqueue" or "print_job"; looked up in the engine's handler table.
+    args: tuple # Positional arguments passed to the handler.
+
+
+# ======================================================================
+# TRACE READERS & WRITERS
+# Traces are read lazily, one line at a time, so a trace of millions of
+# events never has to fit in memory. Events must be in time order.
+# ======================================================================
+
+def read_jsonl_trace(path: str):
+    """
+    Lazily reads a JSON Lines trace. Each non-blank line is an object such as
+    {"time": 12, "event": "enqueue", "args": ["alice", "report.pdf", 3]};
+    "args" may be omitted for events without arguments.
+    Args:
+        path (str): Path of the trace file.
+    Returns:
+        Iterator[TraceEvent]: The events of the trace, in file order.
+    """
+    with open(path, encoding="utf-8") as trace_file:
+        for line_number, line in enumerate(trace_file, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                yield TraceEvent(int(record["time"]), record["event"], tuple(record.get("args", ())))
+            except (ValueError, KeyError, TypeError) as e:
+                raise ValueError(f"{path}:{line_number}: invalid trace record: {e}") from e
+
+
+# Positions of the arguments that CSV traces pass as ints, by event type: the priority and
+# expiry time of "enqueue", the count of "print_job" and the seconds of "advance". All other
+# cells stay strings, so user IDs and titles such as "007" or "2024" arrive unchanged.
+_CSV_INT_ARGS = {"enqueue": (2, 3), "print_job": (0,), "advance": (0,)}
+
+
+def read_csv_trace(path: str):
+    """
+    Lazily reads a CSV trace. The first row is a header whose first two columns
+    are "time" and "event"; the remaining cells of each row are the event's
+    positional arguments, e.g. "12,enqueue,alice,report.pdf,3". Trailing empty
+    cells are dropped, and the numeric arguments of the built-in events (the
+    priority and expiry time of "enqueue", the count of "print_job" and the
+    seconds of "advance") are converted to int; every other cell is a string.
+    Args:
+        path (str): Path of the trace file.
+    Returns:
+        Iterator[TraceEvent]: The events of the trace, in file order.
+    """
+    with open(path, newline="", encoding="utf-8") as trace_file:
+        reader = csv.reader(trace_file)
+        header = next(reader, None)
+        if header is None:
+            return
+        if [column.strip().lower() for column in header[:2]] != ["time", "event"]:
+            raise ValueError(f"{path}: CSV trace header must start with 'time,event', got {header[:2]!r}")
+        for row in reader:
+            if not row:
+                continue
+            try:
+                sim_time = int(row[0])
+            except (ValueError, IndexError) as e:
+                raise ValueError(f"{path}:{reader.line_num}: invalid trace row {row!r}") from e
+            args = row[2:]
+            while args and args[-1] == "":
+                args.pop()
+            try:
+                for position in _CSV_INT_ARGS.get(row[1], ()):
+                    if position < len(args):
+                        args[position] = int(args[position])
+            except ValueError as e:
+                raise ValueError(f"{path}:{reader.line_num}: invalid trace row {row!r}") from e
+            yield TraceEvent(sim_time, row[1], tuple(args))
+
+
+def read_trace(path: str):
+    """
+    Lazily reads a trace file, choosing the format from its extension (.csv or JSON Lines).
+    """
+    return read_csv_trace(path) if path.lower().endswith(".csv") else read_jsonl_trace(path)
+
+
+def write_jsonl_trace(path: str, events) -> int:
+    """
+    Writes trace events to a JSON Lines file that read_jsonl_trace() can replay.
+    Args:
+        path (str): Path of the trace file to create.
+        events (Iterable[TraceEvent | tuple]): (time, event, args) triples.
+    Returns:
+        int: The number of events written.
+    """
+    count = 0
+    with open(path, "w", encoding="utf-8") as trace_file:
+        for sim_time, event, args in events:
+            trace_file.write(json.dumps({"time": sim_time, "event": event, "args": list(args)}) + "\n")
+            count += 1
+    return count
+
+
+def trace_from_events(simulation_events: list[tuple], start_time: int = 0):
+    """
+    Expresses a main.py style event list, [(event_type, *args), ...], as a trace.
+    "tick" and "advance" events only move the timestamp of the events after them;
+    the engine then skips that idle time itself. If the list ends with idle time,
+    a final "wait" event keeps the clock moving to the end of it.
+    Args:
+        simulation_events (list[tuple]): The event list.
+        start_time (int): Timestamp of the first event.
+    Returns:
+        Iterator[TraceEvent]: The equivalent trace.
+    """
+    sim_time = start_time
+    last_event_time = start_time
+    for event_type, *args in simulation_events:
+        if event_type == "tick":
+            sim_time += 1
+        elif event_type == "advance":
+            sim_time += args[0]
+        else:
+            yield TraceEvent(sim_time, event_type, tuple(args))
+            last_event_time = sim_time
+    if sim_time > last_event_time:
+        yield TraceEvent(sim_time, "wait", ())
+
+
+# ======================================================================
+# SIMULATION ENGINE
+# ======================================================================
+
+class SimulationEngine:
+    """
+    A discrete-event driver for a PrintQueueManager (or anything with the same
+    interface, such as ShardedPrintQueueManager).
+
+    Trace events and events scheduled by handlers wait in one heap ordered by
+    (time, scheduling order). Only one event per trace is read ahead, so traces
+    are replayed as streams. Before an event runs, the manager's clock is
+    moved straight to the event's timestamp with run_until(), so idle stretches
+    cost nothing no matter how long they are. Each event is then dispatched
+    through the handler table, which maps event types to callables taking the
+    event's arguments; register_handler() adds or replaces entries.
+    """
+    def __init__(self, manager: PrintQueueManager, verbose: bool = False):
+        """
+        Args:
+            manager (PrintQueueManager): The queue the events are applied to.
+            verbose (bool): Print a header and footer line around every event, as main.py does.
+        """
+        self.manager = manager
+        self.verbose = verbose
+        # Heap of (time, sequence number, event type, args, source trace or None) waiting to run.
+        self._schedule = []
+        self._sequence = itertools.count() # Keeps events with equal timestamps in scheduling order.
+        self.handlers = {
+            "enqueue": self._on_enqueue,
+            "simultaneous_submit": self._on_simultaneous_submit,
+            "enqueue_many": self._on_enqueue_many,
+            "print_job": self._on_print_job,
+            "tick": self._on_tick,
+            "advance": self._on_advance,
+            "show_status": manager.show_status,
+            "comment": self._on_comment,
+            "wait": lambda: None, # Only moves the clock to the event's timestamp.
+        }
+        self.reset_stats()
+
+    def register_handler(self, event_type: str, handler):
+        """
+        Adds or replaces the handler for an event type.
+        Args:
+            event_type (str): The event type.
+            handler (Callable): Called with the event's arguments.
+        """
+        self.handlers[event_type] = handler
+
+    def schedule(self, sim_time: int, event_type: str, *args):
+        """
+        Schedules an event, e.g. from a handler. Events scheduled for the same
+        time run in the order they were scheduled.
+        """
+        heapq.heappush(self._schedule, (sim_time, next(self._sequence), event_type, args, None))
+
+    def reset_stats(self):
+        """
+        Clears the counters reported by summary().
+        """
+        self.events_processed = 0
+        self.event_counts = {} # event type -> number of events dispatched
+        self.unknown_events = 0
+        self.jobs_enqueued = 0
+        self.jobs_rejected = 0
+        self.jobs_printed = 0
+        self.jobs_expired = 0
+        self.total_wait_time = 0.0 # Sum of the waiting times of printed jobs.
+        self.max_wait_time = 0.0
+        self.start_time = self.manager.current_simulation_time
+        self.wall_time = 0.0 # Real seconds spent in run().
+
+    def run(self, *traces, until: int | None = None) -> dict:
+        """
+        Replays traces together with any scheduled events. Several traces are
+        merged by timestamp, as if they were one.
+        Args:
+            *traces (Iterable[TraceEvent | tuple]): (time, event, args) triples in time order,
+                e.g. from read_trace() or trace_from_events().
+            until (int | None): Stop before events later than this time and move the clock to it.
+                Events left over stay scheduled for the next run().
+        Returns:
+            dict: The summary statistics (see summary()).
+        """
+        started = time.perf_counter()
+        for trace in traces:
+            self._read_ahead(iter(trace))
+        schedule = self._schedule
+        while schedule:
+            entry = heapq.heappop(schedule)
+            sim_time, _, event_type, args, source = entry
+            if until is not None and sim_time > until:
+                heapq.heappush(schedule, entry) # Keep it for a later run().
+                break
+            if source is not None:
+                self._read_ahead(source, sim_time)
+            self._dispatch(sim_time, event_type, args)
+
+        if until is not None:
+            self.jobs_expired += self.manager.run_until(until)
+        self.wall_time += time.perf_counter() - started
+        return self.summary()
+
+    def _read_ahead(self, source, previous_time: int | None = None):
+        """
+        Moves the next event of a trace into the schedule; each trace has at most one event there.
+        """
+        trace_event = next(source, None)
+        if trace_event is None:
+            return
+        sim_time, event_type, args = trace_event
+        if previous_time is not None and sim_time < previous_time:
+            raise ValueError(f"trace is not in time order: event {event_type!r} at {sim_time}s "
+                             f"follows an event at {previous_time}s")
+        heapq.heappush(self._schedule, (sim_time, next(self._sequence), event_type, tuple(args), source))
+
+    def _dispatch(self, sim_time: int, event_type: str, args: tuple):
+        if sim_time > self.manager.current_simulation_time:
+            self.jobs_expired += self.manager.run_until(sim_time)
+        self.events_processed += 1
+        if self.verbose:
+            print(f"\n--- Processing Event {self.events_processed}: {event_type.replace('_', ' ').title()} ---")
+        handler = self.handlers.get(event_type)
+        if handler is None:
+            self.unknown_events += 1
+            print(f"ERROR: Unknown event type encountered: {event_type}")
+        else:
+            self.event_counts[event_type] = self.event_counts.get(event_type, 0) + 1
+            handler(*args)
+        if self.verbose:
+            print(f"INFO: Finished event {self.events_processed}. "
+                  f"Current simulation time: {self.manager.current_simulation_time}s.")
+
+    # --- Default handlers ---
+
+    def _on_enqueue(self, user_id: str, title: str, priority: int = 5, expiry_time: int | None = None):
+        if self.manager.enqueue_job(user_id, title, priority, expiry_time):
+            self.jobs_enqueued += 1
+        else:
+            self.jobs_rejected += 1
+
+    def _count_batch(self, results: list[bool]):
+        accepted = sum(results)
+        self.jobs_enqueued += accepted
+        self.jobs_rejected += len(results) - accepted
+
+    def _on_simultaneous_submit(self, jobs_data: list):
+        # Logged like PrintQueueManager.handle_simultaneous_submissions(), but counted from
+        # enqueue_many()'s results rather than its outcome messages.
+        events = self.manager.events
+        events.emit(INFO, "batch_started", self.manager.current_simulation_time)
+        self._count_batch(self.manager.enqueue_many([tuple(job_info) for job_info in jobs_data]))
+        events.emit(INFO, "batch_complete", self.manager.current_simulation_time)
+        events.dispatch()
+
+    def _on_enqueue_many(self, jobs_data: list):
+        self._count_batch(self.manager.enqueue_many([tuple(job_info) for job_info in jobs_data]))
+
+    def _on_print_job(self, count: int = 1):
+        for _ in range(count):
+            job = self.manager.print_job()
+            if job is None:
+                break
+            self._record_printed(job)
+
+    def _record_printed(self, job: PrintJob):
+        # Adds a printed job to the statistics; subclasses extend this to gather more.
+        self.jobs_printed += 1
+        self.total_wait_time += job.waiting_time
+        self.max_wait_time = max(self.max_wait_time, job.waiting_time)
+
+    def _on_tick(self):
+        self.jobs_expired += self.manager.tick()
+
+    def _on_advance(self, seconds: int):
+        self.jobs_expired += self.manager.advance(seconds)
+
+    def _on_comment(self, text: str):
+        print(f"\n{text}")
+
+    # --- Reporting ---
+
+    def summary(self) -> dict:
+        """
+        Returns the statistics gathered since the engine was created or reset.
+        Returns:
+            dict: events_processed, event_counts, unknown_events, jobs_enqueued, jobs_rejected,
+                jobs_printed, jobs_expired, jobs_remaining, mean_wait_time, max_wait_time,
+                simulated_seconds, wall_time and events_per_second.
+        """
+        return {
+            'events_processed': self.events_processed,
+            'event_counts': dict(self.event_counts),
+            'unknown_events': self.unknown_events,
+            'jobs_enqueued': self.jobs_enqueued,
+            'jobs_rejected': self.jobs_rejected,
+            'jobs_printed': self.jobs_printed,
+            'jobs_expired': self.jobs_expired,
+            'jobs_remaining': len(self.manager),
+            'mean_wait_time': self.total_wait_time / self.jobs_printed if self.jobs_printed else 0.0,
+            'max_wait_time': self.max_wait_time,
+            'simulated_seconds': self.manager.current_simulation_time - self.start_time,
+            'wall_time': self.wall_time,
+            'events_per_second': self.events_processed / self.wall_time if self.wall_time else 0.0,
+        }
+
+    def show_summary(self):
+        """
+        Prints the summary statistics as a table.
+        """
+        stats = self.summary()
+        print("\n=== Simulation Summary ===")
+        for label, key, fmt in (("Events processed", 'events_processed', "d"),
+                                ("Unknown events", 'unknown_events', "d"),
+                                ("Jobs enqueued", 'jobs_enqueued', "d"),
+                                ("Jobs rejected", 'jobs_rejected', "d"),
+                                ("Jobs printed", 'jobs_printed', "d"),
+                                ("Jobs expired", 'jobs_expired', "d"),
+                                ("Jobs remaining", 'jobs_remaining', "d"),
+                                ("Mean wait (s)", 'mean_wait_time', ".1f"),
+                                ("Max wait (s)", 'max_wait_time', ".1f"),
+                                ("Simulated (s)", 'simulated_seconds', "d"),
+                                ("Wall time (s)", 'wall_time', ".3f"),
+                                ("Events/s", 'events_per_second', ",.0f")):
+            print(f"{label:<18} | {stats[key]:{fmt}}")
+        print("=" * 40)
@@ -0,0 +1,230 @@
+# Runs one PrintQueueManager simulation per point of a capacity x expiry_time x
+# aging_interval grid, in parallel across a process pool, and tabulates
+# throughput, rejection and expiry rates and waiting-time percentiles.
+# Every point replays the same workload: a trace file, or a synthetic
+# workload generated from a seed.
+#
+# Usage:
+#   python sweep_print_queue.py                                            # default grid, synthetic load
+#   python sweep_print_queue.py --capacities 20 50 --expiry-times 120 300 --aging-intervals 5 15
+#   python sweep_print_queue.py --trace site-a.jsonl --csv site-a-sweep.csv
+#   python sweep_print_queue.py --arrival-rate 3 --print-rate 2.5 --duration 86400 --workers 8
+
+import argparse
+import csv
+import itertools
+import os
+import random
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from print_queue_events import EventLog, OFF
+from print_queue_manager import PrintQueueManager, PrintJob
+from simulation_engine import SimulationEngine, TraceEvent, read_trace
+
+DEFAULT_CAPACITIES = [10, 50, 100]
+DEFAULT_EXPIRY_TIMES = [60, 300]
+DEFAULT_AGING_INTERVALS = [5, 10, 30]
+RESULT_COLUMNS = ["capacity", "expiry_time", "aging_interval", "jobs_submitted", "jobs_printed", "jobs_rejected",
+                  "jobs_expired", "jobs_remaining", "throughput", "rejection_rate", "expiry_rate",
+                  "wait_p50", "wait_p95", "wait_p99", "wait_max", "wall_time"]
+
+
+def synthetic_trace(duration: int, arrival_rate: float, print_rate: float, users: int = 20, seed: int = 0):
+    """
+    Generates a bursty office workload: Poisson job arrivals with random users
+    and priorities, and a printer that prints `print_rate` jobs per second.
+    The same arguments always produce the same trace.
+    Args:
+        duration (int): Simulated seconds covered by the trace.
+        arrival_rate (float): Mean job submissions per second.
+        print_rate (float): Jobs printed per second; fractions carry over between seconds.
+        users (int): Number of distinct users submitting jobs.
+        seed (int): Random seed.
+    Returns:
+        Iterator[TraceEvent]: The trace, in time order.
+    """
+    rng = random.Random(seed)
+    next_arrival = rng.expovariate(arrival_rate) if arrival_rate > 0 else float("inf")
+    print_credit = 0.0
+    job_number = 0
+    for second in range(duration):
+        while next_arrival < second + 1:
+            job_number += 1
+            # Mostly routine jobs, with the occasional urgent one.
+            priority = rng.choices((1, 2, 3, 4, 5, 6, 7, 8, 9, 10), weights=(1, 1, 2, 3, 8, 8, 6, 4, 2, 1))[0]
+            yield TraceEvent(second, "enqueue", (f"user{rng.randrange(users)}", f"job-{job_number}", priority))
+            next_arrival += rng.expovariate(arrival_rate)
+        print_credit += print_rate
+        if print_credit >= 1:
+            yield TraceEvent(second, "print_job", (int(print_credit),))
+            print_credit -= int(print_credit)
+    yield TraceEvent(duration, "wait", ())
+
+
+class _SweepEngine(SimulationEngine):
+    """
+    A quiet SimulationEngine that also keeps the distribution of waiting times.
+    Simulated waiting times are whole seconds, so a Counter gives exact
+    percentiles in memory proportional to the longest wait, not to the job count.
+    """
+    def __init__(self, manager: PrintQueueManager):
+        super().__init__(manager)
+        self.wait_times = Counter() # Waiting time (s) -> number of printed jobs that waited that long.
+        self.register_handler("show_status", lambda: None)
+        self.register_handler("comment", lambda text: None)
+
+    def _record_printed(self, job: PrintJob):
+        super()._record_printed(job)
+        self.wait_times[int(job.waiting_time)] += 1
+
+    def wait_percentile(self, fraction: float) -> int:
+        """
+        Returns the smallest waiting time that at least `fraction` of the printed jobs did not exceed.
+        """
+        rank = fraction * self.jobs_printed
+        cumulative = 0
+        for wait_time in sorted(self.wait_times):
+            cumulative += self.wait_times[wait_time]
+            if cumulative >= rank:
+                return wait_time
+        return 0
+
+
+def run_point(point: tuple, workload: dict) -> dict:
+    """
+    Runs one simulation of the grid. Executed in a worker process: the trace is
+    re-read (or re-generated) there instead of being shipped between processes.
+    Args:
+        point (tuple): (capacity, expiry_time, aging_interval).
+        workload (dict): Either {'trace': path} or the keyword arguments of synthetic_trace().
+    Returns:
+        dict: One results row; see RESULT_COLUMNS.
+    """
+    capacity, expiry_time, aging_interval = point
+    manager = PrintQueueManager(capacity, expiry_time, aging_interval, event_log=EventLog(sinks=[], level=OFF))
+    engine = _SweepEngine(manager)
+    trace = read_trace(workload['trace']) if 'trace' in workload else synthetic_trace(**workload)
+    started = time.perf_counter()
+    stats = engine.run(trace)
+    submitted = stats['jobs_enqueued'] + stats['jobs_rejected']
+    simulated_seconds = stats['simulated_seconds']
+    return {
+        'capacity': capacity,
+        'expiry_time': expiry_time,
+        'aging_interval': aging_interval,
+        'jobs_submitted': submitted,
+        'jobs_printed': stats['jobs_printed'],
+        'jobs_rejected': stats['jobs_rejected'],
+        'jobs_expired': stats['jobs_expired'],
+        'jobs_remaining': stats['jobs_remaining'],
+        'throughput': stats['jobs_printed'] / simulated_seconds if simulated_seconds else 0.0,
+        'rejection_rate': stats['jobs_rejected'] / submitted if submitted else 0.0,
+        'expiry_rate': stats['jobs_expired'] / submitted if submitted else 0.0,
+        'wait_p50': engine.wait_percentile(0.50),
+        'wait_p95': engine.wait_percentile(0.95),
+        'wait_p99': engine.wait_percentile(0.99),
+        'wait_max': int(stats['max_wait_time']),
+        'wall_time': time.perf_counter() - started,
+    }
+
+
+def run_sweep(capacities: list[int], expiry_times: list[int], aging_intervals: list[int], workload: dict,
+              workers: int | None = None, on_result=None) -> list[dict]:
+    """
+    Runs run_point() for every combination of the parameters.
+    Args:
+        capacities (list[int]): Queue capacities to try.
+        expiry_times (list[int]): Default job expiry times (s) to try.
+        aging_intervals (list[int]): Priority aging intervals (s) to try.
+        workload (dict): The workload every point replays (see run_point()).
+        workers (int | None): Worker processes; None uses one per CPU, and 1 runs in this process.
+        on_result (Callable[[dict], None] | None): Called with each row as it completes.
+    Returns:
+        list[dict]: The results rows, in grid order.
+    """
+    points = list(itertools.product(capacities, expiry_times, aging_intervals))
+    if workers == 1:
+        results = []
+        for point in points:
+            results.append(run_point(point, workload))
+            if on_result is not None:
+                on_result(results[-1])
+        return results
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(run_point, point, workload) for point in points]
+        results = []
+        for future in futures:
+            results.append(future.result())
+            if on_result is not None:
+                on_result(results[-1])
+        return results
+
+
+def print_result_header():
+    print(f"{'Cap':>6} | {'Expiry':>6} | {'Aging':>5} | {'Submitted':>9} | {'Printed':>9} | {'Jobs/s':>7} | "
+          f"{'Rejected':>8} | {'Expired':>7} | {'p50 (s)':>7} | {'p95 (s)':>7} | {'p99 (s)':>7} | {'Max (s)':>7} | "
+          f"{'Wall (s)':>8}")
+    print("-" * 125)
+
+
+def print_result(result: dict):
+    print(f"{result['capacity']:>6,} | {result['expiry_time']:>6} | {result['aging_interval']:>5} | "
+          f"{result['jobs_submitted']:>9,} | {result['jobs_printed']:>9,} | {result['throughput']:>7.2f} | "
+          f"{result['rejection_rate']:>8.1%} | {result['expiry_rate']:>7.1%} | {result['wait_p50']:>7} | "
+          f"{result['wait_p95']:>7} | {result['wait_p99']:>7} | {result['wait_max']:>7} | "
+          f"{result['wall_time']:>8.2f}", flush=True)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Sweep PrintQueueManager settings over a workload in parallel.")
+    parser.add_argument("--capacities", nargs="+", type=int, default=DEFAULT_CAPACITIES,
+                        help="queue capacities to try (default: 10 50 100)")
+    parser.add_argument("--expiry-times", nargs="+", type=int, default=DEFAULT_EXPIRY_TIMES,
+                        help="default job expiry times in seconds (default: 60 300)")
+    parser.add_argument("--aging-intervals", nargs="+", type=int, default=DEFAULT_AGING_INTERVALS,
+                        help="priority aging intervals in seconds (default: 5 10 30)")
+    parser.add_argument("--trace", metavar="PATH", help="replay a JSON Lines or CSV trace instead of a synthetic load")
+    parser.add_argument("--duration", type=int, default=3600, help="synthetic load: simulated seconds (default: 3600)")
+    parser.add_argument("--arrival-rate", type=float, default=1.0,
+                        help="synthetic load: mean job submissions per second (default: 1.0)")
+    parser.add_argument("--print-rate", type=float, default=0.9,
+                        help="synthetic load: jobs printed per second (default: 0.9)")
+    parser.add_argument("--users", type=int, default=20, help="synthetic load: distinct users (default: 20)")
+    parser.add_argument("--seed", type=int, default=0, help="synthetic load: random seed")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes (default: one per CPU; 1 runs everything in this process)")
+    parser.add_argument("--csv", metavar="PATH", help="also write the results table to a CSV file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    if args.trace:
+        workload = {'trace': args.trace}
+        description = f"trace {args.trace}"
+    else:
+        workload = {'duration': args.duration, 'arrival_rate': args.arrival_rate, 'print_rate': args.print_rate,
+                    'users': args.users, 'seed': args.seed}
+        description = (f"synthetic load ({args.duration}s, {args.arrival_rate}/s arrivals, "
+                       f"{args.print_rate}/s printing, seed {args.seed})")
+    points = len(args.capacities) * len(args.expiry_times) * len(args.aging_intervals)
+    print(f"INFO: Sweeping {points} setting(s) over {description} with "
+          f"{args.workers or os.cpu_count()} worker(s).")
+    print_result_header()
+    started = time.perf_counter()
+    results = run_sweep(args.capacities, args.expiry_times, args.aging_intervals, workload, args.workers,
+                        on_result=print_result)
+    print(f"INFO: Sweep finished in {time.perf_counter() - started:.2f}s.")
+
+    if args.csv:
+        with open(args.csv, "w", newline="", encoding="utf-8") as csv_file:
+            writer = csv.DictWriter(csv_file, fieldnames=RESULT_COLUMNS)
+            writer.writeheader()
+            writer.writerows(results)
+        print(f"INFO: Results written to {args.csv}.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,163 @@
+"""
+Tests for print_queue_journal: a queue recovered from its journal must match
+the queue that wrote it, and a torn or corrupt log tail must be dropped
+without losing the records before it.
+"""
+import glob
+import os
+import random
+
+import pytest
+
+from print_queue_events import EventLog, OFF
+from print_queue_journal import Journal, _read_records
+from print_queue_manager import (PrintQueueManager, OVERFLOW_REJECT, OVERFLOW_EVICT_LOWEST, OVERFLOW_EVICT_OLDEST)
+
+
+def make_manager(directory, snapshot_every=0, **kwargs):
+    return PrintQueueManager(event_log=EventLog(sinks=[], level=OFF),
+                             journal=Journal(str(directory), snapshot_every=snapshot_every), **kwargs)
+
+
+def queue_state(manager):
+    """The clock, the last aging time and every queued job's durable fields."""
+    with manager.lock:
+        jobs = sorted((job.job_id, job.user_id, job.title, job.priority, job._seq, job.enqueued_at,
+                       job.expiry_time, job.created_at) for job in manager._iter_ring())
+        return manager.current_simulation_time, manager._aged_at, jobs
+
+
+def print_order(manager):
+    order = []
+    while (job := manager.print_job()) is not None:
+        order.append((job.job_id, job.title, job.priority))
+    return order
+
+
+def random_operations(manager, rnd, steps):
+    """Applies a random mix of every journaled operation."""
+    for step in range(steps):
+        r = rnd.random()
+        if r < 0.4:
+            manager.enqueue_job(f"u{rnd.randint(1, 4)}", f"job {step} é", rnd.randint(1, 9),
+                                rnd.choice([None, rnd.randint(1, 30)]))
+        elif r < 0.5:
+            manager.print_job()
+        elif r < 0.7:
+            manager.tick()
+        elif r < 0.75:
+            manager.advance(rnd.randint(1, 15))
+        elif r < 0.8:
+            manager.apply_priority_aging()
+        elif r < 0.9:
+            with manager.lock:
+                jobs = list(manager._iter_ring())
+            if jobs:
+                manager.reprioritize(rnd.choice(jobs).job_id, rnd.randint(1, 9))
+        elif r < 0.95:
+            with manager.lock:
+                jobs = list(manager._iter_ring())
+            if jobs:
+                manager.cancel_job(rnd.choice(jobs).job_id)
+        else:
+            manager.cancel_user_jobs(f"u{rnd.randint(1, 4)}")
+
+
+@pytest.mark.parametrize("seed", range(12))
+def test_recovered_queue_matches_the_original(tmp_path, seed):
+    rnd = random.Random(seed)
+    settings = dict(capacity=rnd.choice([3, 8, 20]), expiry_time=rnd.randint(5, 60), aging_interval=rnd.randint(1, 6),
+                    overflow=rnd.choice([OVERFLOW_REJECT, OVERFLOW_EVICT_LOWEST, OVERFLOW_EVICT_OLDEST]))
+    original = make_manager(tmp_path, snapshot_every=rnd.choice([0, 5, 40]), **settings)
+    random_operations(original, rnd, rnd.randint(20, 300))
+    if rnd.random() < 0.5:
+        original._journal.snapshot()
+        random_operations(original, rnd, 20)
+    original._journal.close()
+
+    recovered = make_manager(tmp_path, **settings)
+    assert queue_state(recovered) == queue_state(original)
+
+    # Both queues must also behave the same from here on.
+    for manager in (original, recovered):
+        manager.enqueue_job("later", "after recovery", 3)
+        manager.advance(7)
+        manager.tick()
+    expected = [title_and_priority for _, *title_and_priority in print_order(original)]
+    assert [title_and_priority for _, *title_and_priority in print_order(recovered)] == expected
+    recovered._journal.close()
+
+
+def test_recovery_from_a_snapshot_and_the_log_after_it(tmp_path):
+    manager = make_manager(tmp_path, capacity=50)
+    for number in range(10):
+        manager.enqueue_job("u", f"before {number}", 5)
+    manager._journal.snapshot()
+    for number in range(3):
+        manager.enqueue_job("u", f"after {number}", 2)
+    manager.print_job()
+    manager._journal.close()
+
+    recovered = make_manager(tmp_path, capacity=50)
+    assert queue_state(recovered) == queue_state(manager)
+    assert len(recovered) == 12
+    assert glob.glob(os.path.join(tmp_path, "snapshot-*"))
+    recovered._journal.close()
+
+
+def last_segment(directory):
+    return sorted(glob.glob(os.path.join(directory, "wal-*")),
+                  key=lambda path: int(os.path.basename(path)[4:].split(".")[0]))[-1]
+
+
+def write_jobs(directory, titles):
+    manager = make_manager(directory, capacity=10)
+    for title in titles:
+        manager.enqueue_job("u", title, 5)
+    manager._journal.close()
+    return manager
+
+
+@pytest.mark.parametrize("damage", ["truncate", "corrupt", "garbage"])
+def test_torn_tail_is_dropped_and_the_prefix_recovered(tmp_path, damage):
+    write_jobs(tmp_path, ["a", "b", "c"])
+    path = last_segment(tmp_path)
+    with open(path, "r+b") as segment:
+        data = segment.read()
+        if damage == "truncate":
+            segment.truncate(len(data) - 3) # The last record was only partly written.
+        elif damage == "corrupt":
+            segment.seek(len(data) - 1)
+            segment.write(bytes([data[-1] ^ 0xFF])) # Its checksum no longer matches.
+        else:
+            segment.write(b"\x05\x00\x00\x00garbage") # A header with no valid record behind it.
+    expected = ["a", "b", "c"] if damage == "garbage" else ["a", "b"]
+
+    recovered = make_manager(tmp_path, capacity=10)
+    assert sorted(job.title for job in recovered._iter_ring()) == expected
+    with open(path, "rb") as segment:
+        data = segment.read()
+    ends = [end for *_, end in _read_records(data)]
+    assert ends and ends[-1] == len(data) # The torn bytes were truncated away.
+
+    # The log stays usable: later changes are recovered after the repaired tail.
+    recovered.enqueue_job("u", "d", 5)
+    recovered._journal.close()
+    again = make_manager(tmp_path, capacity=10)
+    assert sorted(job.title for job in again._iter_ring()) == expected + ["d"]
+    again._journal.close()
+
+
+def test_records_after_a_torn_segment_are_discarded(tmp_path):
+    write_jobs(tmp_path, ["a"])
+    first = last_segment(tmp_path)
+    manager = make_manager(tmp_path, capacity=10) # Recovery starts a new segment.
+    manager.enqueue_job("u", "b", 5)
+    manager._journal.close()
+    assert last_segment(tmp_path) != first
+
+    with open(first, "r+b") as segment:
+        segment.truncate(os.path.getsize(first) - 1)
+    recovered = make_manager(tmp_path, capacity=10)
+    assert len(recovered) == 0 # Nothing after the torn record can be trusted.
+    recovered._journal.close()
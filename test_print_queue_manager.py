@@ -0,0 +1,282 @@
+"""
+Tests for PrintQueueManager: the job-ID and per-user indexes, the aging
+cohorts and the expiry index must stay consistent with the circular array
+through cancel_job(), cancel_user_jobs() and reprioritize(), and each
+overflow policy must decide what happens to a job arriving at a full queue.
+"""
+import random
+import threading
+import time
+import uuid
+
+import pytest
+
+from print_queue_events import EventLog, OFF
+from print_queue_manager import (PrintQueueManager, OVERFLOW_POLICIES, OVERFLOW_REJECT, OVERFLOW_BLOCK,
+                                 OVERFLOW_EVICT_LOWEST, OVERFLOW_EVICT_OLDEST, OVERFLOW_SPILL, STATUS_CANCELLED,
+                                 STATUS_EVICTED, STATUS_SPILLED, STATUS_WAITING)
+
+
+def make_manager(**kwargs):
+    return PrintQueueManager(event_log=EventLog(sinks=[], level=OFF), **kwargs)
+
+
+def check_invariants(manager):
+    """Asserts that every index agrees with the circular array and the overflow store."""
+    with manager.lock:
+        queued = list(manager._iter_ring())
+        spilled = list(manager._overflow)
+        assert len(queued) == manager.size <= manager.capacity
+        assert len(manager.queue) <= 2 * manager.capacity
+
+        waiting = queued + spilled
+        assert {id(job) for job in manager._jobs_by_number.values()} == {id(job) for job in waiting}
+        by_user = {}
+        for job in waiting:
+            by_user.setdefault(job.user_id, set()).add(id(job))
+            assert manager._find_job(job.job_id) is job
+        assert {user: {id(job) for job in jobs} for user, jobs in manager._jobs_by_user.items()} == by_user
+
+        for job in queued:
+            assert job.status == STATUS_WAITING
+            assert job in job._cohort and job.priority == job._cohort.level
+            assert manager.queue[job._slot] is job
+        for job in spilled:
+            assert job.status == STATUS_SPILLED
+            assert job._cohort is None and job._slot is None
+        assert sum(len(cohort) for cohorts in manager._levels.values() for cohort in cohorts.values()) == len(queued)
+
+        assert len(manager._expiry_index) == len(queued)
+        if queued:
+            assert manager._next_job() is min(queued, key=lambda job: (job.priority, job._seq))
+            assert manager._expiry_index.peek() is min(queued, key=lambda job: (job.enqueued_at + job.expiry_time,
+                                                                                 job._seq))
+        else:
+            assert manager._expiry_index.peek() is None
+
+
+def queued_jobs(manager):
+    with manager.lock:
+        return list(manager._iter_ring())
+
+
+def test_cancel_job_removes_only_that_job():
+    manager = make_manager(capacity=5)
+    for title in "abcd":
+        manager.enqueue_job("u", title, 5)
+    jobs = queued_jobs(manager)
+
+    assert manager.cancel_job(jobs[1].job_id) is True
+    assert jobs[1].status == STATUS_CANCELLED
+    assert manager.get_job(jobs[1].job_id) is None
+    assert manager.cancel_job(jobs[1].job_id) is False # Already gone.
+    assert manager.cancel_job(str(uuid.uuid4())) is False
+    assert manager.cancel_job("not a job ID") is False
+    check_invariants(manager)
+    assert [manager.print_job().title for _ in range(3)] == ["a", "c", "d"]
+    check_invariants(manager)
+
+
+def test_cancel_job_removes_a_spilled_job_without_admitting_it():
+    manager = make_manager(capacity=1, overflow=OVERFLOW_SPILL)
+    for title in "abc":
+        manager.enqueue_job("u", title, 5)
+    spilled = manager._overflow
+    first_spilled = next(iter(spilled))
+    assert manager.cancel_job(first_spilled.job_id) is True
+    assert first_spilled.status == STATUS_CANCELLED
+    check_invariants(manager)
+    manager.print_job()
+    assert [job.title for job in queued_jobs(manager)] == ["c"]
+    check_invariants(manager)
+
+
+def test_cancel_user_jobs_removes_queued_and_spilled_jobs():
+    manager = make_manager(capacity=3, overflow=OVERFLOW_SPILL)
+    for user, title in [("ann", "a1"), ("bob", "b1"), ("ann", "a2"), ("ann", "a3"), ("bob", "b2")]:
+        manager.enqueue_job(user, title, 5)
+
+    assert manager.cancel_user_jobs("ann") == 3
+    assert manager.cancel_user_jobs("ann") == 0
+    assert manager.cancel_user_jobs("nobody") == 0
+    check_invariants(manager)
+    assert [job.title for job in queued_jobs(manager)] == ["b1", "b2"] # The spilled bob job took a freed slot.
+    assert not manager._overflow
+
+
+def test_reprioritize_moves_a_job_between_levels():
+    manager = make_manager(capacity=5, aging_interval=1000)
+    for title, priority in [("a", 3), ("b", 5), ("c", 7)]:
+        manager.enqueue_job("u", title, priority)
+    c = queued_jobs(manager)[2]
+
+    assert manager.reprioritize(c.job_id, 1) is True
+    assert c.priority == 1
+    check_invariants(manager)
+    assert manager.reprioritize(str(uuid.uuid4()), 1) is False
+    with pytest.raises(TypeError):
+        manager.reprioritize(c.job_id, "1")
+    with pytest.raises(TypeError):
+        manager.reprioritize(c.job_id, True)
+    assert [manager.print_job().title for _ in range(3)] == ["c", "a", "b"]
+
+
+def test_reprioritized_job_keeps_its_aging_schedule():
+    manager = make_manager(capacity=5, aging_interval=2)
+    manager.enqueue_job("u", "a", 5)
+    manager.tick()
+    manager.enqueue_job("u", "b", 5)
+    b = queued_jobs(manager)[1]
+    manager.reprioritize(b.job_id, 8)
+    manager.tick() # b has waited 1 second: not due yet.
+    assert b.priority == 8
+    manager.tick() # b has waited 2 seconds.
+    assert b.priority == 7
+    check_invariants(manager)
+
+
+@pytest.mark.parametrize("policy", [policy for policy in OVERFLOW_POLICIES if policy != OVERFLOW_BLOCK])
+@pytest.mark.parametrize("seed", range(8))
+def test_indexes_stay_consistent_under_random_operations(policy, seed):
+    rnd = random.Random(seed)
+    manager = make_manager(capacity=rnd.choice([1, 4, 16]), expiry_time=rnd.randint(2, 40),
+                           aging_interval=rnd.randint(1, 5), overflow=policy, overflow_limit=rnd.choice([None, 3]))
+    users = ["ann", "bob", "cid"]
+    for step in range(400):
+        r = rnd.random()
+        with manager.lock:
+            waiting = list(manager._iter_ring()) + list(manager._overflow)
+        if r < 0.35:
+            manager.enqueue_job(rnd.choice(users), f"t{step}", rnd.randint(1, 9),
+                                rnd.choice([None, None, rnd.randint(1, 20)]))
+        elif r < 0.45:
+            manager.enqueue_many([(rnd.choice(users), f"m{step}", rnd.randint(1, 9)) for _ in range(3)])
+        elif r < 0.55:
+            manager.print_job()
+        elif r < 0.65:
+            manager.tick()
+        elif r < 0.7:
+            manager.advance(rnd.randint(1, 10))
+        elif r < 0.8 and waiting:
+            job = rnd.choice(waiting)
+            assert manager.cancel_job(job.job_id) is True
+            assert job.status == STATUS_CANCELLED
+        elif r < 0.85:
+            user = rnd.choice(users)
+            count = sum(job.user_id == user for job in waiting)
+            assert manager.cancel_user_jobs(user) == count
+        elif waiting:
+            job = rnd.choice(waiting)
+            priority = rnd.randint(1, 9)
+            assert manager.reprioritize(job.job_id, priority) is True
+            assert job.priority == priority
+        check_invariants(manager)
+
+
+@pytest.mark.parametrize("capacity", [0, -1])
+def test_capacity_below_one_is_rejected(capacity):
+    with pytest.raises(ValueError):
+        make_manager(capacity=capacity)
+
+
+def test_unknown_overflow_policy_is_rejected():
+    with pytest.raises(ValueError):
+        make_manager(overflow="drop")
+
+
+def test_reject_policy_turns_away_new_jobs():
+    manager = make_manager(capacity=2, overflow=OVERFLOW_REJECT)
+    assert [manager.enqueue_job("u", title, 5) for title in "abc"] == [True, True, False]
+    assert [job.title for job in queued_jobs(manager)] == ["a", "b"]
+    assert manager.get_metrics()['jobs']['rejected'] == 1
+    check_invariants(manager)
+
+
+def test_evict_oldest_policy_makes_room_for_every_new_job():
+    manager = make_manager(capacity=2, overflow=OVERFLOW_EVICT_OLDEST)
+    for title in "ab":
+        manager.enqueue_job("u", title, 1)
+    oldest = queued_jobs(manager)[0]
+    assert manager.enqueue_job("u", "c", 9) is True
+    assert oldest.status == STATUS_EVICTED
+    assert [job.title for job in queued_jobs(manager)] == ["b", "c"]
+    check_invariants(manager)
+
+
+def test_evict_lowest_policy_evicts_the_newest_least_urgent_job():
+    manager = make_manager(capacity=3, overflow=OVERFLOW_EVICT_LOWEST)
+    for title, priority in [("a", 7), ("b", 7), ("c", 2)]:
+        manager.enqueue_job("u", title, priority)
+    assert manager.enqueue_job("u", "d", 8) is False # Less urgent than everything queued.
+    assert manager.enqueue_job("u", "e", 7) is False # Only as urgent as the least urgent job.
+    b = queued_jobs(manager)[1]
+    assert manager.enqueue_job("u", "f", 3) is True
+    assert b.status == STATUS_EVICTED
+    assert sorted(job.title for job in queued_jobs(manager)) == ["a", "c", "f"]
+    check_invariants(manager)
+
+
+def test_evict_lowest_policy_sees_reprioritized_jobs():
+    manager = make_manager(capacity=2, overflow=OVERFLOW_EVICT_LOWEST, aging_interval=1000)
+    manager.enqueue_job("u", "a", 5)
+    manager.enqueue_job("u", "b", 5)
+    a = queued_jobs(manager)[0]
+    manager.reprioritize(a.job_id, 9)
+    assert manager.enqueue_job("u", "c", 6) is True
+    assert a.status == STATUS_EVICTED
+    check_invariants(manager)
+
+
+def test_spill_policy_admits_spilled_jobs_in_order():
+    manager = make_manager(capacity=2, overflow=OVERFLOW_SPILL, overflow_limit=2)
+    assert [manager.enqueue_job("u", title, 5) for title in "abcde"] == [True] * 4 + [False]
+    assert [job.status for job in manager._overflow] == [STATUS_SPILLED] * 2
+    check_invariants(manager)
+    manager.tick()
+    assert manager.print_job().title == "a"
+    c = queued_jobs(manager)[1]
+    assert (c.title, c.status, c.enqueued_at) == ("c", STATUS_WAITING, 1) # Queued from the moment it got a slot.
+    check_invariants(manager)
+    assert [manager.print_job().title for _ in range(3)] == ["b", "c", "d"]
+    check_invariants(manager)
+
+
+def test_spill_policy_refills_the_queue_as_jobs_expire():
+    manager = make_manager(capacity=1, overflow=OVERFLOW_SPILL, expiry_time=3)
+    for title in "abc":
+        manager.enqueue_job("u", title, 5)
+    manager.advance(4)
+    assert [job.title for job in queued_jobs(manager)] == ["b"]
+    check_invariants(manager)
+    manager.advance(10)
+    assert len(manager) == 0 and not manager._overflow
+    check_invariants(manager)
+
+
+def test_block_policy_waits_for_room():
+    manager = make_manager(capacity=1, overflow=OVERFLOW_BLOCK, block_timeout=0.1)
+    manager.enqueue_job("u", "a", 5)
+    started = time.monotonic()
+    assert manager.enqueue_job("u", "b", 5) is False # Timed out.
+    assert time.monotonic() - started >= 0.1
+
+    manager.block_timeout = 5
+    printer = threading.Timer(0.05, manager.print_job)
+    printer.start()
+    assert manager.enqueue_job("u", "c", 5) is True
+    printer.join()
+    assert [job.title for job in queued_jobs(manager)] == ["c"]
+    check_invariants(manager)
+
+
+def test_circular_array_grows_and_shrinks_within_bounds():
+    manager = make_manager(capacity=1000)
+    for number in range(1000):
+        manager.enqueue_job("u", str(number), 5)
+        if number % 3 == 0:
+            manager.print_job()
+    check_invariants(manager)
+    while manager.print_job() is not None:
+        pass
+    assert len(manager.queue) == 64
+    check_invariants(manager)